@@ -0,0 +1,145 @@
+"""
+Exercise the hedged fetch policy against local NSE and BSE stand-in servers
+The NSE stand-in is usually fast, sometimes slow and occasionally hangs (as
+under throttling), then has an outage; the BSE stand-in is steady. Compares
+per-symbol latency with and without hedging and checks that losers are
+cancelled and the circuit breaker moves traffic during the outage.
+"""
+
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from hedged_fetch import BSEQuoteSource, HedgedQuoteFetcher, LatencyTracker, NSEQuoteSource
+
+SYMBOLS = 300
+OUTAGE = range(200, 230)
+MAX_WAIT = 3.0
+
+
+class StandInServer:
+    """Minimal HTTP/1.1 server whose handler returns (delay, status, body)"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.port = 0
+        self.served = 0
+        self.aborted = 0
+        self.ready = threading.Event()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                url = urlsplit(request_line.decode('latin-1').split()[1])
+                delay, status, body = self.respond(url.path, parse_qs(url.query))
+
+                # A client that gives up closes the connection; stop "working" then
+                sleeper = asyncio.ensure_future(asyncio.sleep(delay))
+                closed = asyncio.ensure_future(reader.read(1))
+                await asyncio.wait({sleeper, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if closed.done():
+                    sleeper.cancel()
+                    self.aborted += 1
+                    return
+                closed.cancel()
+                await asyncio.gather(closed, return_exceptions=True)
+
+                payload = json.dumps(body).encode()
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                             f"Set-Cookie: nsit=1; Path=/\r\nContent-Length: {len(payload)}\r\n\r\n"
+                             .encode() + payload)
+                await writer.drain()
+                self.served += 1
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def start(self) -> None:
+        async def serve():
+            server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+            self.port = server.sockets[0].getsockname()[1]
+            self.ready.set()
+            async with server:
+                await server.serve_forever()
+
+        threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+        self.ready.wait(5)
+
+
+def main() -> int:
+    rng = random.Random(3)
+    state = {'n': 0}
+
+    def nse(path: str, query: Dict):
+        if path == '/':
+            return 0.0, 200, {}
+        symbol = query['symbol'][0]
+        if state['n'] in OUTAGE:
+            return 0.01, 503, {}
+        roll = rng.random()
+        delay = rng.uniform(0.02, 0.06) if roll < 0.90 else rng.uniform(0.5, 1.0) if roll < 0.98 else 30.0
+        return delay, 200, {'info': {'companyName': symbol, 'isin': 'INE000000000'},
+                            'priceInfo': {'lastPrice': 100.0, 'previousClose': 99.0, 'pChange': 1.01}}
+
+    def bse(path: str, query: Dict):
+        return rng.uniform(0.05, 0.10), 200, {
+            'Header': {'PrevClose': '99.00'}, 'CurrRate': {'LTP': '100.05', 'Chg': '1.05', 'PcChg': '1.06'}}
+
+    nse_server, bse_server = StandInServer(nse), StandInServer(bse)
+    nse_server.start()
+    bse_server.start()
+    symbols = [f"SYM{i}" for i in range(SYMBOLS)]
+    instruments = {s: {'bse_code': str(500000 + i), 'company_name': s} for i, s in enumerate(symbols)}
+
+    results = {}
+    for label, mapped in (('NSE only', {}), ('Hedged', instruments)):
+        rng.seed(3)
+        fetcher = HedgedQuoteFetcher(
+            NSEQuoteSource(base_url=f"http://127.0.0.1:{nse_server.port}"),
+            BSEQuoteSource(mapped, base_url=f"http://127.0.0.1:{bse_server.port}"),
+            tracker=LatencyTracker(initial=0.3), max_wait=MAX_WAIT, reset_seconds=0.5)
+        aborted_before = nse_server.aborted + bse_server.aborted
+        latencies: List[float] = []
+        sources = {'NSE': 0, 'BSE': 0, None: 0}
+        for n, symbol in enumerate(symbols):
+            state['n'] = n
+            started = time.perf_counter()
+            quote = fetcher.get_quote(symbol)
+            latencies.append(time.perf_counter() - started)
+            sources[quote.source if quote else None] += 1
+        time.sleep(0.2)
+        results[label] = (sorted(latencies), sources, fetcher.stats,
+                          nse_server.aborted + bse_server.aborted - aborted_before,
+                          fetcher.tracker.deadline())
+        fetcher.close()
+
+    print("=" * 72)
+    print(f"Hedged fetch vs local stand-ins ({SYMBOLS} symbols, NSE outage for {len(OUTAGE)})")
+    print("=" * 72)
+    for label, (lat, sources, stats, aborted, deadline) in results.items():
+        pct = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1000
+        print(f"{label:9} p50 {pct(0.50):7.1f} ms | p95 {pct(0.95):7.1f} ms | p99 {pct(0.99):7.1f} ms | "
+              f"total {sum(lat):6.1f} s | NSE {sources['NSE']} BSE {sources['BSE']} none {sources[None]}")
+        print(f"{'':9} {stats}; server saw {aborted} abandoned; hedge deadline {deadline * 1000:.0f} ms")
+
+    hedged_lat, hedged_sources, hedged_stats, hedged_aborted, _ = results['Hedged']
+    plain_lat = results['NSE only'][0]
+    ok = (hedged_lat[int(len(hedged_lat) * 0.99)] < plain_lat[int(len(plain_lat) * 0.99)]
+          and hedged_sources[None] == 0 and hedged_stats.breaker_skips > 0 and hedged_aborted > 0)
+    print("✅ Hedging cut the tail" if ok else "❌ Hedging did not behave as expected")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Benchmark the price alert index with 1M alerts
+Builds the index, replays one update cycle of price moves through it, and
+compares a sample against a brute-force scan of every alert
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from price_alerts import PERCENT_AXIS, PRICE_AXIS, AlertIndex
+
+ALERTS = 1_000_000
+SYMBOLS = 2000
+SAMPLE = 20
+BUILD_BUDGET_SECONDS = 10.0
+CYCLE_BUDGET_SECONDS = 1.0
+
+
+def synthetic_alerts(rng: np.random.Generator, base: np.ndarray):
+    symbol_codes = rng.integers(0, SYMBOLS, ALERTS)
+    is_percent = rng.random(ALERTS) < 0.3
+    directions = rng.choice(['above', 'below', 'both'], ALERTS)
+    price_thresholds = base[symbol_codes] * rng.uniform(0.8, 1.2, ALERTS)
+    percent_thresholds = rng.choice([1.0, 2.0, 3.0, 5.0, 10.0], ALERTS)
+    thresholds = np.where(is_percent, percent_thresholds, price_thresholds).round(2)
+    alerts = [{
+        'id': str(i), 'user_id': f"u{i % 50000}", 'symbol': f"SYM{code}",
+        'alert_type': 'percent' if pct else 'price', 'threshold': t, 'direction': d,
+        'cooldown_minutes': 60, 'trigger_once': False, 'last_triggered': None
+    } for i, (code, pct, t, d) in enumerate(zip(symbol_codes.tolist(), is_percent.tolist(),
+                                                thresholds.tolist(), directions.tolist()))]
+    return alerts, symbol_codes, is_percent, thresholds, directions
+
+
+def brute_force(code, axis, old, new, symbol_codes, is_percent, thresholds, directions):
+    """Check every alert: the O(alerts) per quote this index avoids"""
+    up = new > old
+    lo, hi = min(old, new), max(old, new)
+    mine = symbol_codes == code
+    if axis == PRICE_AXIS:
+        values, watch = thresholds, ~is_percent & (directions != ('below' if up else 'above'))
+    else:
+        want = 'above' if up else 'below'
+        values = thresholds if up else -thresholds
+        watch = is_percent & ((directions == want) | (directions == 'both'))
+    inside = (values > lo) & (values <= hi) if up else (values >= lo) & (values < hi)
+    return set(np.flatnonzero(mine & watch & inside).tolist())
+
+
+def main() -> int:
+    rng = np.random.default_rng(7)
+    base = rng.uniform(50, 5000, SYMBOLS)
+    alerts, symbol_codes, is_percent, thresholds, directions = synthetic_alerts(rng, base)
+
+    started = time.perf_counter()
+    index = AlertIndex(alerts)
+    build_seconds = time.perf_counter() - started
+
+    old_change = rng.normal(0, 1.5, SYMBOLS)
+    new_change = old_change + rng.normal(0, 1.0, SYMBOLS)
+    old_price = base * (1 + old_change / 100)
+    new_price = base * (1 + new_change / 100)
+
+    started = time.perf_counter()
+    fired = 0
+    for code in range(SYMBOLS):
+        symbol = f"SYM{code}"
+        candidates = np.concatenate([
+            index.crossed(symbol, PRICE_AXIS, old_price[code], new_price[code]),
+            index.crossed(symbol, PERCENT_AXIS, old_change[code], new_change[code]),
+        ])
+        fired += len(index.fire(candidates, now=1e9))
+    cycle_seconds = time.perf_counter() - started
+
+    # Fresh index so debouncing from the cycle above does not hide matches
+    check = AlertIndex(alerts)
+    mismatches = 0
+    started = time.perf_counter()
+    for code in range(SAMPLE):
+        symbol = f"SYM{code}"
+        for axis, old, new in ((PRICE_AXIS, old_price[code], new_price[code]),
+                               (PERCENT_AXIS, old_change[code], new_change[code])):
+            expected = brute_force(code, axis, old, new, symbol_codes, is_percent, thresholds, directions)
+            if set(check.crossed(symbol, axis, old, new).tolist()) != expected:
+                mismatches += 1
+    brute_seconds = (time.perf_counter() - started) / SAMPLE * SYMBOLS
+
+    print("=" * 60)
+    print(f"Price alert benchmark ({ALERTS:,} alerts over {SYMBOLS} symbols)")
+    print("=" * 60)
+    print(f"  Build index:                   {build_seconds:8.2f} s")
+    print(f"  Evaluate one cycle of moves:   {cycle_seconds * 1000:8.1f} ms "
+          f"({cycle_seconds / SYMBOLS * 1e6:.1f} µs per quote)")
+    print(f"  Alerts fired:                  {fired:8,}")
+    print(f"  Brute-force scan, estimated:   {brute_seconds:8.2f} s per cycle")
+    print(f"  Mismatches vs brute force:     {mismatches:8} (sample of {SAMPLE} symbols)")
+
+    ok = build_seconds < BUILD_BUDGET_SECONDS and cycle_seconds < CYCLE_BUDGET_SECONDS and not mismatches
+    print("✅ Within budget" if ok else "❌ Over budget or mismatched")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
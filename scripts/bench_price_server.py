@@ -0,0 +1,119 @@
+"""
+Load test for the live price push server
+Starts PriceServer locally, connects thousands of simulated SSE subscribers
+(some deliberately slow), publishes rounds of price changes and reports
+delivery latency and how many updates were coalesced for slow clients
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from price_server import PriceServer
+
+SUBSCRIBERS = 3000
+SYMBOLS = 500
+SYMBOLS_PER_CLIENT = 5
+SLOW_CLIENT_RATIO = 0.1
+ROUNDS = 20
+ROUND_INTERVAL = 0.05
+
+
+class SimulatedClient:
+    def __init__(self, symbols: List[str], slow: bool):
+        self.symbols = symbols
+        self.slow = slow
+        self.latest: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.events = 0
+
+    async def run(self, port: int, connected: asyncio.Event) -> None:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=2 ** 20)
+        writer.write(f"GET /prices?symbols={','.join(self.symbols)} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        connected.set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.startswith(b'data: '):
+                    continue
+                received = time.time()
+                self.events += 1
+                for update in json.loads(line[6:]):
+                    self.latest[update['symbol']] = update['price']
+                    self.latencies.append(received - update['ts'])
+                if self.slow:
+                    await asyncio.sleep(0.5)
+        finally:
+            writer.close()
+
+
+async def run_load_test() -> int:
+    server = PriceServer(port=0)
+    server.start_in_thread()
+    symbols = [f"SYM{i}" for i in range(SYMBOLS)]
+    random.seed(7)
+
+    clients = [SimulatedClient(random.sample(symbols, SYMBOLS_PER_CLIENT), random.random() < SLOW_CLIENT_RATIO)
+               for _ in range(SUBSCRIBERS)]
+    connected = [asyncio.Event() for _ in clients]
+    started = time.time()
+    tasks = [asyncio.create_task(c.run(server.port, e)) for c, e in zip(clients, connected)]
+    await asyncio.gather(*(e.wait() for e in connected))
+    connect_seconds = time.time() - started
+    while server.subscriber_count() < SUBSCRIBERS:
+        await asyncio.sleep(0.05)
+
+    prices = {s: 100.0 for s in symbols}
+    publish_started = time.time()
+    for _ in range(ROUNDS):
+        for symbol in symbols:
+            prices[symbol] = round(prices[symbol] * random.uniform(0.99, 1.01), 2)
+            server.publish(symbol, prices[symbol], 0.0)
+        await asyncio.sleep(ROUND_INTERVAL)
+
+    # Every client, slow ones included, must converge on the final prices
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if all(all(c.latest.get(s) == prices[s] for s in c.symbols) for c in clients):
+            break
+        await asyncio.sleep(0.1)
+    total_seconds = time.time() - publish_started
+    converged = sum(all(c.latest.get(s) == prices[s] for s in c.symbols) for c in clients)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    fast = [l for c in clients if not c.slow for l in c.latencies]
+    slow_clients = [c for c in clients if c.slow]
+    published = ROUNDS * SYMBOLS_PER_CLIENT
+    slow_received = statistics.mean(len(c.latencies) for c in slow_clients) if slow_clients else 0
+    quantiles = statistics.quantiles(fast, n=100)
+
+    print("=" * 60)
+    print(f"Price server load test ({SUBSCRIBERS:,} subscribers, {SYMBOLS} symbols, {ROUNDS} rounds)")
+    print("=" * 60)
+    print(f"  Connect all subscribers:     {connect_seconds:8.2f} s")
+    print(f"  Publish + converge:          {total_seconds:8.2f} s")
+    print(f"  Clients on final prices:     {converged:8d} / {SUBSCRIBERS}")
+    print(f"  Fast client latency p50:     {quantiles[49] * 1000:8.1f} ms")
+    print(f"  Fast client latency p99:     {quantiles[98] * 1000:8.1f} ms")
+    print(f"  Updates per slow client:     {slow_received:8.1f} of {published} published (rest coalesced)")
+    return 0 if converged == SUBSCRIBERS else 1
+
+
+def main() -> int:
+    return asyncio.run(run_load_test())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
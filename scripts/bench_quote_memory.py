@@ -0,0 +1,83 @@
+"""
+Benchmark quote memory: legacy dict quotes vs Quote records
+Builds 5,000 quotes from synthetic NSE payloads and compares the heap
+retained by each shape (the shared raw payload is excluded from both)
+"""
+
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+
+from quote import Quote
+
+SYMBOL_COUNT = 5000
+
+
+def make_payload(i: int) -> dict:
+    price = round(random.uniform(10, 5000), 2)
+    return {
+        'info': {'companyName': f"Company {i} Limited", 'isin': f"INE{i:09d}"},
+        'priceInfo': {
+            'lastPrice': price,
+            'previousClose': price * 0.99,
+            'open': price * 0.995,
+            'change': price * 0.01,
+            'pChange': 1.0,
+            'intraDayHighLow': {'max': price * 1.02, 'min': price * 0.98},
+        },
+        'preOpenMarket': {'totalTradedVolume': random.randint(0, 10_000_000)},
+    }
+
+
+def legacy_quote(symbol: str, data: dict) -> dict:
+    """The dict shape NSEDataFetcher.get_quote returned before Quote"""
+    price_info = data.get('priceInfo', {})
+    info = data.get('info', {})
+    pre_open = data.get('preOpenMarket', {})
+    return {
+        'symbol': symbol,
+        'company_name': info.get('companyName', ''),
+        'isin': info.get('isin', ''),
+        'current_price': float(price_info.get('lastPrice', 0)),
+        'previous_close': float(price_info.get('previousClose', 0)),
+        'open': float(price_info.get('open', 0)),
+        'high': float(price_info.get('intraDayHighLow', {}).get('max', 0)),
+        'low': float(price_info.get('intraDayHighLow', {}).get('min', 0)),
+        'change': float(price_info.get('change', 0)),
+        'change_percent': float(price_info.get('pChange', 0)),
+        'volume': int(pre_open.get('totalTradedVolume', 0)),
+        'last_updated': datetime.now().isoformat(),
+        'raw_data': data
+    }
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(records) == SYMBOL_COUNT
+    return after - before
+
+
+def main():
+    random.seed(42)
+    # Symbols arrive as fresh strings from each DB read, as in the updater
+    symbols = [''.join(['SYM', str(i)]) for i in range(SYMBOL_COUNT)]
+    payloads = [make_payload(i) for i in range(SYMBOL_COUNT)]
+
+    dict_bytes = measure(lambda: [legacy_quote(s, p) for s, p in zip(symbols, payloads)])
+    quote_bytes = measure(lambda: [Quote.from_nse(s, p) for s, p in zip(symbols, payloads)])
+
+    print("=" * 60)
+    print(f"Quote memory benchmark ({SYMBOL_COUNT:,} symbols, Python {sys.version.split()[0]})")
+    print("=" * 60)
+    print(f"  dict quotes:  {dict_bytes / 1024:10.1f} KiB ({dict_bytes / SYMBOL_COUNT:6.0f} B/quote)")
+    print(f"  Quote slots:  {quote_bytes / 1024:10.1f} KiB ({quote_bytes / SYMBOL_COUNT:6.0f} B/quote)")
+    print(f"  Reduction:    {(1 - quote_bytes / dict_bytes) * 100:10.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark the risk engine on a 500-asset x 5-year price matrix
+Times alignment, a from-scratch computation and a one-day incremental
+update with the day's new market-value weights, and checks the
+incremental result matches a full recomputation
+"""
+
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from risk_engine import TRADING_DAYS, RiskEngine, align_prices, log_returns
+
+ASSETS = 500
+DAYS = 5 * 252
+WINDOW = 63
+BUDGET_SECONDS = 5.0
+
+
+def rolling_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """
+    Annualised rolling volatility for every day and asset in one pass (the
+    from-scratch baseline the incremental engine is compared with)
+
+    Args:
+        returns: (days, assets) daily returns
+        window: Window length in days
+
+    Returns:
+        (days, assets) array; NaN until a full window is available
+    """
+    n = window
+    c1 = np.cumsum(np.vstack([np.zeros((1, returns.shape[1])), returns]), axis=0)
+    c2 = np.cumsum(np.vstack([np.zeros((1, returns.shape[1])), returns ** 2]), axis=0)
+    s1 = c1[n:] - c1[:-n]
+    s2 = c2[n:] - c2[:-n]
+    var = np.maximum(s2 - s1 ** 2 / n, 0) / (n - 1)
+    out = np.full(returns.shape, np.nan)
+    out[n - 1:] = np.sqrt(var * TRADING_DAYS)
+    return out
+
+
+def synthetic_history(rng: np.random.Generator):
+    dates = [date(2021, 1, 1) + timedelta(days=i) for i in range(DAYS)]
+    bench_returns = rng.normal(0.0003, 0.01, DAYS)
+    betas = rng.uniform(0.5, 1.5, ASSETS)
+    returns = bench_returns[:, None] * betas + rng.normal(0, 0.012, (DAYS, ASSETS))
+    prices = 100 * np.exp(np.cumsum(returns, axis=0))
+    bench = 100 * np.exp(np.cumsum(bench_returns))
+    series = {f"SYM{j}": dict(zip(dates, prices[:, j])) for j in range(ASSETS)}
+    series['INDEX:NIFTY 50'] = dict(zip(dates, bench))
+    return series, betas
+
+
+def main() -> int:
+    rng = np.random.default_rng(1)
+    series, betas = synthetic_history(rng)
+
+    started = time.perf_counter()
+    dates, assets, prices = align_prices(series)
+    align_seconds = time.perf_counter() - started
+
+    bench = prices[:, assets.index('INDEX:NIFTY 50')]
+    cols = [j for j, a in enumerate(assets) if a != 'INDEX:NIFTY 50']
+    names = [assets[j] for j in cols]
+    held = prices[:, cols]
+    quantities = rng.uniform(1, 100, len(cols))
+    # Weights are market values, so they move with every day's prices
+    weights = quantities * held[-1]
+
+    engine = RiskEngine()
+    started = time.perf_counter()
+    engine.compute('family', WINDOW, dates[:-1], names, held[:-1], bench[:-1], quantities * held[-2])
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    incremental = engine.compute('family', WINDOW, dates, names, held, bench, weights)
+    incremental_seconds = time.perf_counter() - started
+    pushed = engine.rebuilds == 1
+
+    started = time.perf_counter()
+    rolling_volatility(log_returns(held), WINDOW)
+    rolling_seconds = time.perf_counter() - started
+
+    fresh = RiskEngine().compute('family', WINDOW, dates, names, held, bench, weights)
+    drift = max(float(np.nanmax(np.abs(incremental[k] - fresh[k])))
+                for k in ('volatility', 'beta', 'max_drawdown', 'correlation'))
+    expected_betas = np.array([betas[int(n[3:])] for n in names])
+    beta_error = float(np.mean(np.abs(fresh['beta'][:-1] - expected_betas)))
+    # Drawdown is over the window's WINDOW + 1 prices, not all history
+    recent = held[-WINDOW - 1:]
+    expected_drawdown = (recent / np.maximum.accumulate(recent, axis=0) - 1).min(axis=0)
+    drawdown_error = float(np.max(np.abs(fresh['max_drawdown'][:-1] - expected_drawdown)))
+
+    total = align_seconds + full_seconds
+    print("=" * 60)
+    print(f"Risk engine benchmark ({ASSETS} assets x {DAYS} days, {WINDOW}-day window)")
+    print("=" * 60)
+    print(f"  Align into dense matrix:       {align_seconds * 1000:8.1f} ms")
+    print(f"  Full computation:              {full_seconds * 1000:8.1f} ms")
+    print(f"  One-day incremental update:    {incremental_seconds * 1000:8.1f} ms")
+    print(f"  Rolling volatility, all days:  {rolling_seconds * 1000:8.1f} ms")
+    print(f"  Incremental vs full drift:     {drift:8.1e}")
+    print(f"  Mean |beta - true beta|:       {beta_error:8.3f}")
+    print(f"  Window drawdown error:         {drawdown_error:8.1e}")
+    print(f"  New weights reused the state:  {'yes' if pushed else 'NO'}")
+
+    ok = total < BUDGET_SECONDS and drift < 1e-9 and drawdown_error < 1e-9 and pushed
+    print("✅ Within budget" if ok else f"❌ Over the {BUDGET_SECONDS:.0f}s budget or drifted")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Benchmark CLI startup with `python -X importtime`
+Fails (exit code 1) if `cli.py --help` imports any heavy dependency or
+spends longer than the startup budget importing modules
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+STARTUP_BUDGET_MS = 100
+HEAVY_MODULES = ['supabase', 'httpx', 'requests', 'nsepython', 'pandas', 'numpy', 'schedule', 'pytz']
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Appended to the benchmarked code: report every package loaded, however
+# deeply nested its import was
+LOADED_MARKER = '__loaded_packages__'
+REPORT_LOADED = (f"\nimport sys as _sys\n"
+                 f"print({LOADED_MARKER!r}, *sorted({{m.split('.')[0] for m in _sys.modules}}))")
+
+
+def import_times(code: str) -> Tuple[float, Dict[str, float], Set[str]]:
+    """
+    Run code in a fresh interpreter with -X importtime
+
+    Args:
+        code: Python source passed to `python -c`
+
+    Returns:
+        Tuple of (total self import time in ms, cumulative ms per top-level
+        import, every package in sys.modules when the code finished)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code + REPORT_LOADED],
+        cwd=script_dir, capture_output=True, text=True
+    )
+    loaded: Set[str] = set()
+    for line in result.stdout.splitlines():
+        if line.startswith(LOADED_MARKER):
+            loaded = set(line.split()[1:])
+    total_us = 0
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        # Nesting is shown by indentation; top-level imports have one space
+        if not name.startswith('  '):
+            top = name.strip().split('.')[0]
+            packages[top] = packages.get(top, 0) + int(cumulative_us) / 1000
+    return total_us / 1000, packages, loaded
+
+
+def main() -> int:
+    help_code = "import sys; sys.argv = ['cli.py', '--help']; import cli\ntry: cli.main()\nexcept SystemExit: pass"
+    # Take the best of a few runs so one slow cold start doesn't fail CI
+    runs = [import_times(help_code) for _ in range(5)]
+    total_ms, packages, loaded = min(runs, key=lambda run: run[0])
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+
+    update_ms, _, _ = import_times("import update_market_data")
+
+    print("=" * 60)
+    print("CLI startup benchmark (python -X importtime)")
+    print("=" * 60)
+    print(f"  cli.py --help imports:        {total_ms:8.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    print(f"  update subcommand imports:    {update_ms:8.1f} ms")
+    print("  Slowest top-level imports for --help:")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:5]:
+        print(f"    {name:24} {ms:8.1f} ms")
+
+    failures: List[str] = []
+    if heavy:
+        failures.append(f"heavy modules imported by --help: {', '.join(heavy)}")
+    if total_ms > STARTUP_BUDGET_MS:
+        failures.append(f"import time {total_ms:.1f} ms is over the {STARTUP_BUDGET_MS} ms budget")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Startup within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
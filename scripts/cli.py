@@ -0,0 +1,199 @@
+"""
+Market Data Scripts CLI
+Single entry point for the Python scripts. Heavy dependencies (supabase,
+requests, nsepython, schedule, pytz) are only imported by the subcommand
+that needs them, so `--help` and argument errors start instantly.
+
+Usage:
+    python cli.py update [--hedge] [--copy] [--schedule [--intraday SECONDS] [--push-port PORT] | --portfolio | SYMBOL ...]
+    python cli.py indices
+    python cli.py exposure
+    python cli.py risk
+    python cli.py returns
+    python cli.py mf [--backfill] [--copy] [SCHEME_CODE ...]
+    python cli.py metadata-import [--copy] [CSV_FILE]
+    python cli.py bench {startup,quote-memory,price-server,risk,alerts,hedge,copy}
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+
+def copy_dsn(args: argparse.Namespace) -> Optional[str]:
+    """Postgres connection string for --copy, read from SUPABASE_DB_URL"""
+    if not args.copy:
+        return None
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+    dsn = os.getenv('SUPABASE_DB_URL')
+    if not dsn:
+        raise SystemExit("--copy needs the Postgres connection string in SUPABASE_DB_URL")
+    return dsn
+
+
+def cmd_update(args: argparse.Namespace) -> int:
+    from update_market_data import SupabaseUpdater, run_scheduler
+
+    if args.schedule:
+        run_scheduler(intraday_seconds=args.intraday, push_port=args.push_port, hedge=args.hedge,
+                      copy_dsn=copy_dsn(args))
+        return 0
+
+    updater = SupabaseUpdater(hedge=args.hedge, copy_dsn=copy_dsn(args))
+    if args.symbols:
+        updater.update_stock_data([s.upper() for s in args.symbols])
+    elif args.portfolio:
+        updater.update_all_portfolio_stocks()
+    else:
+        updater.update_all_stocks()
+    if not args.symbols:
+        # A full run is one update cycle (this is what the scheduled workflow runs)
+        updater.update_index_data()
+        updater.update_rollups()
+    updater.print_connection_stats()
+    return 0
+
+
+def cmd_indices(args: argparse.Namespace) -> int:
+    from update_market_data import SupabaseUpdater
+
+    SupabaseUpdater().update_index_data()
+    return 0
+
+
+def cmd_exposure(args: argparse.Namespace) -> int:
+    from update_market_data import SupabaseUpdater
+
+    SupabaseUpdater().update_exposure()
+    return 0
+
+
+def cmd_risk(args: argparse.Namespace) -> int:
+    from update_market_data import SupabaseUpdater
+
+    SupabaseUpdater().update_risk_metrics()
+    return 0
+
+
+def cmd_returns(args: argparse.Namespace) -> int:
+    from update_market_data import SupabaseUpdater
+
+    SupabaseUpdater().update_portfolio_returns()
+    return 0
+
+
+def cmd_mf(args: argparse.Namespace) -> int:
+    from update_market_data import SupabaseUpdater
+
+    updater = SupabaseUpdater(copy_dsn=copy_dsn(args))
+    codes = args.scheme_codes or updater.get_active_scheme_codes_from_portfolio()
+    if not codes:
+        print("No mutual funds found in portfolios")
+        return 0
+    updater.update_mutual_fund_data(codes, backfill=args.backfill)
+    return 0
+
+
+def cmd_metadata_import(args: argparse.Namespace) -> int:
+    import import_stock_metadata
+
+    import_stock_metadata.main(args.csv_file, batch_size=args.batch_size, copy_dsn=copy_dsn(args))
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    if args.name == 'copy':
+        import bench_copy_writer
+        return bench_copy_writer.main()
+    if args.name == 'startup':
+        import bench_startup
+        return bench_startup.main()
+    if args.name == 'hedge':
+        import bench_hedged_fetch
+        return bench_hedged_fetch.main()
+    if args.name == 'alerts':
+        import bench_price_alerts
+        return bench_price_alerts.main()
+    if args.name == 'risk':
+        import bench_risk_engine
+        return bench_risk_engine.main()
+    if args.name == 'price-server':
+        import bench_price_server
+        return bench_price_server.main()
+    import bench_quote_memory
+    bench_quote_memory.main()
+    return 0
+
+
+COPY_HELP = 'Bulk-write with Postgres COPY over SUPABASE_DB_URL instead of PostgREST'
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description='Portfolio tracker market data scripts')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update = subparsers.add_parser('update', help='Update NSE stock prices in market_data')
+    mode = update.add_mutually_exclusive_group()
+    mode.add_argument('--schedule', action='store_true',
+                      help='Run hourly from 9 AM to 4 PM IST on trading days')
+    mode.add_argument('--portfolio', action='store_true',
+                      help='Only update stocks held in portfolios')
+    update.add_argument('--intraday', type=int, metavar='SECONDS',
+                        help='With --schedule, also build 1m/5m bars for held stocks polled this often')
+    update.add_argument('--push-port', type=int, metavar='PORT',
+                        help='With --schedule, push live price changes to dashboards over SSE on this port')
+    update.add_argument('--hedge', action='store_true',
+                        help='Hedge NSE quote requests slower than their p95 with BSE')
+    update.add_argument('--copy', action='store_true', help=COPY_HELP)
+    update.add_argument('symbols', nargs='*', help='Only update these symbols')
+    update.set_defaults(func=cmd_update)
+
+    indices = subparsers.add_parser('indices', help='Snapshot every NSE index into index_data')
+    indices.set_defaults(func=cmd_indices)
+
+    exposure = subparsers.add_parser('exposure', help='Rebuild sector/industry/market cap exposure')
+    exposure.set_defaults(func=cmd_exposure)
+
+    risk = subparsers.add_parser('risk', help='Recompute portfolio risk metrics')
+    risk.set_defaults(func=cmd_risk)
+
+    returns = subparsers.add_parser('returns', help='Store daily time-weighted portfolio returns')
+    returns.set_defaults(func=cmd_returns)
+
+    mf = subparsers.add_parser('mf', help='Update mutual fund NAVs')
+    mf.add_argument('scheme_codes', nargs='*',
+                    help='AMFI scheme codes (defaults to funds held in portfolios)')
+    mf.add_argument('--backfill', action='store_true',
+                    help='Write the full NAV history once (default: only NAVs newer than stored)')
+    mf.add_argument('--copy', action='store_true', help=COPY_HELP)
+    mf.set_defaults(func=cmd_mf)
+
+    metadata = subparsers.add_parser('metadata-import', help='Import stock metadata from an NSE export')
+    metadata.add_argument('csv_file', nargs='?', default='sample_import_template.csv')
+    metadata.add_argument('--batch-size', type=int, default=500)
+    metadata.add_argument('--copy', action='store_true', help=COPY_HELP)
+    metadata.set_defaults(func=cmd_metadata_import)
+
+    bench = subparsers.add_parser('bench', help='Run a benchmark')
+    bench.add_argument('name', choices=['startup', 'quote-memory', 'price-server', 'risk', 'alerts', 'hedge', 'copy'])
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'update' and args.schedule and args.symbols:
+        print("--schedule always updates every stock; drop the symbol list")
+        return 2
+    if args.command == 'update' and (args.intraday or args.push_port) and not args.schedule:
+        print("--intraday and --push-port only work together with --schedule")
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Postgres COPY Write Backend
+Optional bulk path for large writes (full-universe refreshes, history
+backfills, metadata imports) that bypasses PostgREST: rows are streamed with
+COPY into a staging table and merged into the target with one
+INSERT ... ON CONFLICT. Takes the same row dictionaries as the PostgREST
+upserts, so callers can switch backends without changing their rows.
+
+Requires psycopg 3 (`pip install "psycopg[binary]"`) and a direct Postgres
+connection string, e.g. the Supabase database URL in SUPABASE_DB_URL.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+
+# Conflict target per table, matching the on_conflict used with PostgREST
+CONFLICT_KEYS = {
+    'market_data': ('symbol',),
+    'stock_metadata': ('symbol',),
+    'stock_price_history': ('symbol', 'price_date'),
+    'mutual_fund_nav_history': ('scheme_code', 'nav_date'),
+}
+
+
+class CopyWriter:
+    """Bulk upserts over a direct Postgres connection using COPY and a merge"""
+
+    def __init__(self, dsn: str, schema: str = 'public'):
+        """
+        Args:
+            dsn: Postgres connection string
+            schema: Schema holding the target tables
+        """
+        self.dsn = dsn
+        self.schema = schema
+        self.conn = None
+        # Seconds spent in the last upsert's COPY and merge phases
+        self.last_timings: Dict[str, float] = {}
+
+    def connect(self):
+        """Open the connection on first use"""
+        if self.conn is None or self.conn.closed:
+            try:
+                import psycopg
+            except ImportError as e:
+                raise RuntimeError('The COPY backend needs psycopg: pip install "psycopg[binary]"') from e
+            self.conn = psycopg.connect(self.dsn, autocommit=True)
+        return self.conn
+
+    def upsert(self, table: str, rows: Sequence[Dict], on_conflict: Optional[Sequence[str]] = None,
+               ignore_duplicates: bool = False) -> int:
+        """
+        Upsert rows in one transaction: COPY into staging, then merge
+
+        Args:
+            table: Target table (e.g. 'market_data')
+            rows: Row dictionaries, as passed to the PostgREST upsert
+            on_conflict: Conflict columns (defaults to the table's known key)
+            ignore_duplicates: Keep existing rows instead of updating them
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        if not rows:
+            return 0
+        from psycopg import sql
+        from psycopg.types.json import JsonbDumper
+
+        keys = tuple(on_conflict or CONFLICT_KEYS[table])
+        columns = list(rows[0])
+        target = sql.Identifier(self.schema, table)
+        staging = sql.Identifier(f"copy_staging_{table}")
+        column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+        key_list = sql.SQL(', ').join(map(sql.Identifier, keys))
+
+        updates = [c for c in columns if c not in keys]
+        if ignore_duplicates or not updates:
+            action = sql.SQL('DO NOTHING')
+        else:
+            action = sql.SQL('DO UPDATE SET ') + sql.SQL(', ').join(
+                sql.SQL('{} = EXCLUDED.{}').format(sql.Identifier(c), sql.Identifier(c)) for c in updates)
+
+        # PostgREST rows use 'now()' for "stamp on write" (e.g. metadata imports)
+        now_columns = [j for j, c in enumerate(columns) if rows[0].get(c) == 'now()']
+
+        conn = self.connect()
+        with conn.transaction(), conn.cursor() as cur:
+            # JSONB values arrive as dicts, as they do for PostgREST
+            cur.adapters.register_dumper(dict, JsonbDumper)
+            # Temporary tables are never WAL-logged (unlogged) and private to
+            # this session, so concurrent writers cannot see each other's rows
+            cur.execute(sql.SQL('CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP')
+                        .format(staging, target))
+
+            started = time.perf_counter()
+            now = datetime.now(timezone.utc)
+            with cur.copy(sql.SQL('COPY {} ({}) FROM STDIN').format(staging, column_list)) as copy:
+                for row in rows:
+                    values = [row.get(c) for c in columns]
+                    for j in now_columns:
+                        values[j] = now
+                    copy.write_row(values)
+            copied = time.perf_counter()
+
+            # A key repeated within the batch would make ON CONFLICT fail, so
+            # keep only its last row (COPY appends, so the highest ctid)
+            cur.execute(sql.SQL(
+                'INSERT INTO {target} ({columns}) '
+                'SELECT DISTINCT ON ({keys}) {columns} FROM {staging} ORDER BY {keys}, ctid DESC '
+                'ON CONFLICT ({keys}) {action}'
+            ).format(target=target, columns=column_list, keys=key_list, staging=staging, action=action))
+            merged = cur.rowcount
+
+        self.last_timings = {'copy': copied - started, 'merge': time.perf_counter() - copied}
+        return merged
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def create_copy_writer(dsn: Optional[str]) -> Optional[CopyWriter]:
+    """
+    Create a CopyWriter if a connection string is configured
+
+    Args:
+        dsn: Postgres connection string, or None
+
+    Returns:
+        CopyWriter, or None to keep using PostgREST
+    """
+    if not dsn:
+        return None
+    writer = CopyWriter(dsn)
+    writer.connect()
+    return writer
+
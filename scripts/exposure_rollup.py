@@ -0,0 +1,134 @@
+"""
+Exposure Rollups
+Joins held stock positions with stock_metadata once per cycle and sums their
+value by sector, industry and market cap category for every user, family
+member and portfolio, stored one row per scope and dimension in
+portfolio_exposure so an allocation chart is a single read
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from price_history import chunks, fetch_all
+
+# dimension stored -> stock_metadata column
+DIMENSIONS = {
+    'sector': 'sector',
+    'industry': 'industry',
+    'market_cap': 'market_cap_category',
+}
+UNCLASSIFIED = 'Unclassified'
+WRITE_BATCH_SIZE = 500
+
+
+class ExposureRollup:
+    """Computes sector/industry/market cap exposure for every scope in one pass"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def load_positions(self) -> Tuple[List[Dict], Dict[str, Dict], Dict[str, Dict], Dict[str, float]]:
+        """
+        Read held stock/ETF positions with their portfolios, metadata and latest prices
+
+        Returns:
+            Tuple of (investments, portfolios by id, metadata by symbol,
+            current price by symbol)
+        """
+        investments = fetch_all(lambda: self.supabase.table('investments')
+                                .select('id, portfolio_id, symbol, quantity, current_price, purchase_price')
+                                .in_('investment_type', ['stock', 'etf'])
+                                .not_.is_('symbol', 'null')
+                                .gt('quantity', 0)
+                                .order('id'))
+        portfolios = {p['id']: p for p in fetch_all(
+            lambda: self.supabase.table('portfolios')
+            .select('id, user_id, family_member_id').order('id'))}
+
+        symbols = sorted({inv['symbol'] for inv in investments})
+        metadata: Dict[str, Dict] = {}
+        prices: Dict[str, float] = {}
+        for chunk in chunks(symbols):
+            for row in self.supabase.table('stock_metadata').select(
+                    'symbol, ' + ', '.join(DIMENSIONS.values())).in_('symbol', chunk).execute().data:
+                metadata[row['symbol']] = row
+            for row in self.supabase.table('market_data').select(
+                    'symbol, current_price').in_('symbol', chunk).execute().data:
+                if row.get('current_price') is not None:
+                    prices[row['symbol']] = float(row['current_price'])
+        return investments, portfolios, metadata, prices
+
+    def compute(self) -> List[Dict]:
+        """
+        Sum position values by every dimension for every scope in a single pass
+
+        Returns:
+            portfolio_exposure rows
+        """
+        investments, portfolios, metadata, prices = self.load_positions()
+
+        # (scope, scope_id) -> owner columns, and
+        # (scope, scope_id, dimension) -> bucket -> value
+        owners: Dict[Tuple[str, str], Dict] = {}
+        totals: Dict[Tuple[str, str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+        for inv in investments:
+            portfolio = portfolios.get(inv['portfolio_id'])
+            if portfolio is None:
+                continue
+            price = prices.get(inv['symbol']) or inv.get('current_price') or inv.get('purchase_price')
+            value = float(inv['quantity']) * float(price or 0)
+            if value <= 0:
+                continue
+
+            user_id = portfolio['user_id']
+            member_id = portfolio.get('family_member_id')
+            scopes = {
+                # Portfolios without a family member belong to the account holder
+                ('member', member_id or user_id): {'family_member_id': member_id},
+                ('portfolio', portfolio['id']): {'family_member_id': member_id,
+                                                 'portfolio_id': portfolio['id']},
+                ('user', user_id): {},
+            }
+            meta = metadata.get(inv['symbol'], {})
+            for scope, extra in scopes.items():
+                owners[scope] = {'user_id': user_id, **extra}
+                for dimension, column in DIMENSIONS.items():
+                    totals[scope + (dimension,)][meta.get(column) or UNCLASSIFIED] += value
+
+        now = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for (scope, scope_id, dimension), buckets in totals.items():
+            total = sum(buckets.values())
+            ordered = sorted(buckets.items(), key=lambda item: item[1], reverse=True)
+            rows.append({
+                'user_id': owners[(scope, scope_id)]['user_id'],
+                'family_member_id': owners[(scope, scope_id)].get('family_member_id'),
+                'portfolio_id': owners[(scope, scope_id)].get('portfolio_id'),
+                'scope': scope,
+                'scope_id': scope_id,
+                'dimension': dimension,
+                'total_value': round(total, 2),
+                'buckets': [{'name': name, 'value': round(value, 2), 'weight': round(value / total, 4)}
+                            for name, value in ordered],
+                'last_updated': now
+            })
+        return rows
+
+    def update(self) -> int:
+        """
+        Recompute every rollup and replace the stored ones
+
+        Returns:
+            Number of rows written
+        """
+        started = datetime.now(timezone.utc).isoformat()
+        rows = self.compute()
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            self.supabase.table('portfolio_exposure').upsert(
+                rows[i:i + WRITE_BATCH_SIZE], on_conflict='scope,scope_id,dimension'
+            ).execute()
+        # Scopes that no longer hold any stock were not rewritten this run
+        self.supabase.table('portfolio_exposure').delete().lt('last_updated', started).execute()
+        return len(rows)
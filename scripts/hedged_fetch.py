@@ -0,0 +1,367 @@
+"""
+Hedged Quote Fetching
+Sends each quote request to NSE, and if no answer arrives within a deadline
+derived from NSE's recent p95 latency, sends a hedged request to BSE. The
+first answer wins and the other request is cancelled. A circuit breaker per
+source moves traffic to the fallback while NSE keeps failing.
+
+Requests run as asyncio tasks on a private event loop thread, so the loser
+of a hedge is really cancelled (its connection is closed) instead of being
+left to finish in the background.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from http_pool import NSE_BASE_URL, NSE_COOKIE_MAX_AGE, NSE_HEADERS
+from quote import Quote
+
+BSE_API_URL = "https://api.bseindia.com/BseIndiaAPI/api"
+
+BSE_HEADERS = {
+    'User-Agent': NSE_HEADERS['User-Agent'],
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': 'https://www.bseindia.com/',
+    'Origin': 'https://www.bseindia.com',
+}
+
+
+class LatencyTracker:
+    """Rolling latency sample that turns a percentile into a hedge deadline"""
+
+    def __init__(self, window: int = 200, percentile: float = 95, min_samples: int = 20,
+                 initial: float = 2.0, floor: float = 0.25, ceiling: float = 10.0):
+        """
+        Args:
+            window: Latest samples kept
+            percentile: Percentile used as the deadline
+            min_samples: Samples needed before the percentile replaces `initial`
+            initial: Deadline in seconds until enough samples exist
+            floor: Shortest deadline, so a fast streak never hedges everything
+            ceiling: Longest deadline
+        """
+        self.samples = deque(maxlen=window)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial = initial
+        self.floor = floor
+        self.ceiling = ceiling
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def deadline(self) -> float:
+        """Seconds to wait for the primary before hedging"""
+        if len(self.samples) < self.min_samples:
+            return self.initial
+        ordered = sorted(self.samples)
+        rank = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return min(max(ordered[rank], self.floor), self.ceiling)
+
+
+class CircuitBreaker:
+    """
+    Per-source breaker: opens after consecutive failures, then lets a single
+    probe request through once `reset_seconds` have passed
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a request may be sent to this source now"""
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state == self.CLOSED:
+                print(f"⚡ {self.name} circuit opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+    def release(self) -> None:
+        """A probe was cancelled before it finished; let the next request probe"""
+        self.probe_in_flight = False
+
+
+class NSEQuoteSource:
+    """NSE quote-equity API over an async keep-alive client"""
+
+    name = 'NSE'
+
+    def __init__(self, base_url: str = NSE_BASE_URL, timeout: float = 10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.client = None
+        self.cookie_expiry = 0.0
+        self.cookie_lock: Optional[asyncio.Lock] = None
+
+    def supports(self, symbol: str) -> bool:
+        return True
+
+    async def _refresh_cookies(self) -> None:
+        self.client.cookies.clear()
+        await self.client.get(self.base_url + '/')
+        # Refresh a minute early so a request never goes out on a dying cookie
+        self.cookie_expiry = time.time() + NSE_COOKIE_MAX_AGE - 60
+
+    async def fetch(self, symbol: str) -> Quote:
+        import httpx
+
+        if self.client is None:
+            self.client = httpx.AsyncClient(headers=NSE_HEADERS, timeout=self.timeout,
+                                            follow_redirects=True)
+            self.cookie_lock = asyncio.Lock()
+        async with self.cookie_lock:
+            if time.time() >= self.cookie_expiry:
+                await self._refresh_cookies()
+
+        url = f"{self.base_url}/api/quote-equity"
+        response = await self.client.get(url, params={'symbol': symbol})
+        if response.status_code in (401, 403):
+            async with self.cookie_lock:
+                await self._refresh_cookies()
+            response = await self.client.get(url, params={'symbol': symbol})
+        response.raise_for_status()
+        return Quote.from_nse(symbol, response.json())
+
+    async def aclose(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+
+
+class BSEQuoteSource:
+    """BSE scrip header API, keyed by BSE scrip code"""
+
+    name = 'BSE'
+
+    def __init__(self, instruments: Dict[str, Dict], base_url: str = BSE_API_URL, timeout: float = 10):
+        """
+        Args:
+            instruments: NSE symbol -> {'bse_code', 'company_name', 'isin'};
+                symbols without a BSE code are never sent to BSE
+            base_url: BSE API root
+            timeout: Request timeout in seconds
+        """
+        self.instruments = instruments
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.client = None
+
+    def supports(self, symbol: str) -> bool:
+        return bool(self.instruments.get(symbol, {}).get('bse_code'))
+
+    async def fetch(self, symbol: str) -> Quote:
+        import httpx
+
+        if self.client is None:
+            self.client = httpx.AsyncClient(headers=BSE_HEADERS, timeout=self.timeout)
+        info = self.instruments[symbol]
+        response = await self.client.get(f"{self.base_url}/getScripHeaderData/w", params={
+            'Debtflag': '', 'scripcode': info['bse_code'], 'seriesid': ''
+        })
+        response.raise_for_status()
+        return Quote.from_bse(symbol, response.json(), company_name=info.get('company_name') or '',
+                              isin=info.get('isin') or '')
+
+    async def aclose(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+
+
+@dataclass
+class HedgeStats:
+    """Counters for a hedged fetcher"""
+    requests: int = 0
+    primary_wins: int = 0
+    fallback_wins: int = 0
+    hedges: int = 0
+    failovers: int = 0
+    breaker_skips: int = 0
+    cancelled: int = 0
+    failures: int = 0
+
+    def __str__(self) -> str:
+        return (f"{self.requests} requests, {self.primary_wins} primary, {self.fallback_wins} fallback, "
+                f"{self.hedges} hedged, {self.failovers} failed over, {self.breaker_skips} breaker skips, "
+                f"{self.cancelled} cancelled, {self.failures} failed")
+
+
+class HedgedQuoteFetcher:
+    """Primary-first quote fetching with a deadline-triggered hedge to a fallback source"""
+
+    def __init__(self, primary, fallback, tracker: Optional[LatencyTracker] = None,
+                 max_wait: float = 15.0, failure_threshold: int = 5, reset_seconds: float = 60):
+        """
+        Args:
+            primary: Preferred source (NSEQuoteSource)
+            fallback: Hedge source (BSEQuoteSource)
+            tracker: Primary latency tracker that sets the hedge deadline
+            max_wait: Give up on a symbol after this many seconds
+            failure_threshold: Consecutive failures that open a source's breaker
+            reset_seconds: How long a breaker stays open before probing again
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.tracker = tracker or LatencyTracker()
+        self.max_wait = max_wait
+        self.breakers = {
+            source.name: CircuitBreaker(source.name, failure_threshold, reset_seconds)
+            for source in (primary, fallback)
+        }
+        self.stats = HedgeStats()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='hedged-fetch', daemon=True)
+        self.thread.start()
+
+    def get_quote(self, symbol: str) -> Optional[Quote]:
+        """
+        Fetch a quote from whichever source answers first (blocking)
+
+        Args:
+            symbol: NSE stock symbol
+
+        Returns:
+            Quote, or None if no source answered in time
+        """
+        try:
+            return asyncio.run_coroutine_threadsafe(self.fetch(symbol), self.loop).result()
+        except Exception as e:
+            print(f"Error fetching quote for {symbol}: {e}")
+            return None
+
+    async def _attempt(self, source, symbol: str) -> Quote:
+        breaker = self.breakers[source.name]
+        started = time.monotonic()
+        try:
+            quote = await source.fetch(symbol)
+        except asyncio.CancelledError:
+            breaker.release()
+            if source is self.primary:
+                # Lost the race: it took at least this long, which keeps the p95 honest
+                self.tracker.record(time.monotonic() - started)
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        if source is self.primary:
+            self.tracker.record(time.monotonic() - started)
+        return quote
+
+    async def fetch(self, symbol: str) -> Quote:
+        """
+        Fetch one quote under the hedging policy (runs on the fetcher's loop)
+
+        Args:
+            symbol: NSE stock symbol
+
+        Returns:
+            Quote from the first source to answer
+
+        Raises:
+            RuntimeError: No source answered successfully within max_wait
+        """
+        self.stats.requests += 1
+        deadline = time.monotonic() + self.max_wait
+        can_hedge = self.fallback.supports(symbol)
+        primary_allowed = self.breakers[self.primary.name].allow()
+        fallback_allowed = can_hedge and self.breakers[self.fallback.name].allow()
+
+        if not primary_allowed and fallback_allowed:
+            self.stats.breaker_skips += 1
+            return await self._race(symbol, [self.fallback], deadline)
+        # With nothing healthy to fall back to, the primary is still the best bet
+
+        first = asyncio.ensure_future(self._attempt(self.primary, symbol))
+        wait = min(self.tracker.deadline(), self.max_wait) if fallback_allowed else self.max_wait
+        done, _ = await asyncio.wait({first}, timeout=wait)
+        if done and first.exception() is None:
+            self.stats.primary_wins += 1
+            if fallback_allowed:
+                self.breakers[self.fallback.name].release()
+            return first.result()
+        if not fallback_allowed:
+            return await self._race(symbol, [], deadline, running=[first])
+
+        if done:
+            self.stats.failovers += 1
+        else:
+            self.stats.hedges += 1
+        return await self._race(symbol, [self.fallback], deadline,
+                                running=[] if done else [first])
+
+    async def _race(self, symbol: str, sources, deadline: float, running=()) -> Quote:
+        tasks = {asyncio.ensure_future(self._attempt(s, symbol)): s for s in sources}
+        for task in running:
+            tasks[task] = self.primary
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] is self.primary:
+                            self.stats.primary_wins += 1
+                        else:
+                            self.stats.fallback_wins += 1
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+                self.stats.cancelled += 1
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if pending:
+            # Hung past max_wait: count it against the sources still waiting
+            for task in pending:
+                self.breakers[tasks[task].name].record_failure()
+        self.stats.failures += 1
+        raise RuntimeError(f"no quote source answered for {symbol}: {error or 'timed out'}")
+
+    def close(self) -> None:
+        """Close the source clients and stop the loop thread"""
+        async def shutdown():
+            await self.primary.aclose()
+            await self.fallback.aclose()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
@@ -0,0 +1,195 @@
+"""
+Pooled HTTP Clients
+Long-lived keep-alive sessions for NSE, mfapi and PostgREST so the
+scheduled updater reuses warm connections across runs
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+NSE_BASE_URL = "https://www.nseindia.com"
+
+NSE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.nseindia.com/',
+}
+
+# Used when NSE hands out session cookies without an explicit expiry
+NSE_COOKIE_MAX_AGE = 30 * 60
+
+
+@dataclass
+class ConnectionStats:
+    """Counters for a pooled client"""
+    requests: int = 0
+    connections: int = 0
+    handshakes: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests that went over an already open connection"""
+        return max(self.requests - self.connections, 0)
+
+    def __str__(self) -> str:
+        return (f"{self.requests} requests, {self.connections} connections, "
+                f"{self.handshakes} TLS handshakes, {self.reused} reused")
+
+
+def create_pooled_session(pool_size: int = 10, retries: int = 2,
+                          headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a requests session with a keep-alive connection pool
+
+    Args:
+        pool_size: Connections kept open per host
+        retries: Retries on connection errors and 5xx responses
+        headers: Default headers sent with every request
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5,
+                  status_forcelist=(500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    session.request_count = 0
+    session.hooks['response'].append(_count_response(session))
+    return session
+
+
+def _count_response(session: requests.Session):
+    def hook(response, *args, **kwargs):
+        session.request_count += 1
+        return response
+    return hook
+
+
+def session_stats(session: requests.Session) -> ConnectionStats:
+    """
+    Read connection counters from a session created by create_pooled_session
+
+    Args:
+        session: Pooled requests session
+
+    Returns:
+        ConnectionStats for the session's urllib3 pools
+    """
+    stats = ConnectionStats(requests=getattr(session, 'request_count', 0))
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools[key]
+            stats.connections += pool.num_connections
+            if key.key_scheme == 'https':
+                stats.handshakes += pool.num_connections
+    return stats
+
+
+class NSESession:
+    """Pooled NSE session that only re-warms its cookies once they expire"""
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or create_pooled_session(headers=NSE_HEADERS)
+        self.cookie_expiry = 0.0
+        self.cookie_refreshes = 0
+
+    def cookies_valid(self) -> bool:
+        """Check whether the current NSE cookies are still usable"""
+        return time.time() < self.cookie_expiry
+
+    def refresh_cookies(self) -> None:
+        """Visit the NSE homepage to get a fresh set of cookies"""
+        self.session.cookies.clear()
+        self.session.get(NSE_BASE_URL, timeout=10)
+        now = time.time()
+        expiries = [c.expires for c in self.session.cookies if c.expires]
+        expiry = min(expiries) if expiries else now + NSE_COOKIE_MAX_AGE
+        # Refresh a minute early so a request never goes out on a dying cookie
+        self.cookie_expiry = min(expiry, now + NSE_COOKIE_MAX_AGE) - 60
+        self.cookie_refreshes += 1
+
+    def get_json(self, path: str, params: Optional[Dict] = None, timeout: float = 10):
+        """
+        GET an NSE API path and decode the JSON body
+
+        Args:
+            path: API path (e.g., '/api/quote-equity')
+            params: Query parameters
+            timeout: Request timeout in seconds
+
+        Returns:
+            Decoded JSON response
+        """
+        if not self.cookies_valid():
+            self.refresh_cookies()
+
+        url = f"{NSE_BASE_URL}{path}"
+        response = self.session.get(url, params=params, timeout=timeout)
+        if response.status_code in (401, 403):
+            # Cookies were revoked before their expiry; re-warm once
+            self.refresh_cookies()
+            response = self.session.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self) -> ConnectionStats:
+        return session_stats(self.session)
+
+
+class HttpxConnectionCounter:
+    """httpx event hook that counts requests, TCP connects and TLS handshakes"""
+
+    def __init__(self):
+        self.stats = ConnectionStats()
+
+    def on_request(self, request) -> None:
+        self.stats.requests += 1
+        request.extensions['trace'] = self._trace
+
+    def _trace(self, event_name: str, info: Dict) -> None:
+        if event_name == 'connection.connect_tcp.complete':
+            self.stats.connections += 1
+        elif event_name == 'connection.start_tls.complete':
+            self.stats.handshakes += 1
+
+
+def create_postgrest_client(pool_size: int = 10, keepalive_expiry: float = 300):
+    """
+    Create a keep-alive httpx client for the Supabase PostgREST API
+
+    Args:
+        pool_size: Maximum kept-alive connections
+        keepalive_expiry: Seconds an idle connection stays open
+
+    Returns:
+        Tuple of (httpx client, HttpxConnectionCounter)
+    """
+    import httpx
+
+    counter = HttpxConnectionCounter()
+    client = httpx.Client(
+        limits=httpx.Limits(max_connections=pool_size,
+                            max_keepalive_connections=pool_size,
+                            keepalive_expiry=keepalive_expiry),
+        event_hooks={'request': [counter.on_request]},
+        timeout=120,
+        follow_redirects=True,
+    )
+    return client, counter
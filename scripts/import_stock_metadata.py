@@ -4,119 +4,189 @@ Direct import of NSE stock metadata into Supabase
 
 import csv
 import os
-from supabase import create_client
-
-# Load environment
-supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL", "https://vhuvcsomnxntirnyxunj.supabase.co")
-supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-if not supabase_key:
-    with open('.env.local', 'r') as f:
-        for line in f:
-            if line.startswith('SUPABASE_SERVICE_ROLE_KEY='):
-                supabase_key = line.split('=', 1)[1].strip()
-                break
-
-supabase = create_client(supabase_url, supabase_key)
-
-print("=" * 70)
-print("NSE Stock Metadata Import")
-print("=" * 70)
-
-# Read CSV file
-csv_file = 'sample_import_template.csv'
-print(f"\nReading {csv_file}...")
-
-stocks = []
-with open(csv_file, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f, delimiter='\t')
-    for row in reader:
-        # Extract symbol from Ticker (NSE:SYMBOL -> SYMBOL)
-        ticker = row.get('Ticker', '')
-        symbol = ticker.split(':')[1] if ':' in ticker else ticker
-
-        if not symbol or not row.get('Security Name'):
-            continue
-
-        # Prepare metadata
-        current_price = float(row.get('Current Price', 0)) if row.get('Current Price') else None
-        market_cap = float(row['Market Capitalization']) if row.get('Market Capitalization') else None
-
-        # Calculate outstanding shares (in crores)
-        # Formula: outstanding_shares = market_cap / current_price
-        outstanding_shares = None
-        if market_cap and current_price and current_price > 0:
-            outstanding_shares = market_cap / current_price
-
-        metadata = {
-            'symbol': symbol.upper().strip(),
-            'company_name': row.get('Security Name', '').strip(),
-            'sector': row.get('Sector', None),
-            'industry': row.get('Industry', None),
-            'industry_type': row.get('Industry Type', None),
-            'industry_sub_group': row.get('Industry Subgroup Name', None),
-            'macro_economic_indicator': row.get('Macro-Economic Indicator', None),
-            'market_cap_category': row.get('Company Type', None),
-            'market_cap': market_cap,
-            'outstanding_shares': outstanding_shares,
-            'last_updated': 'now()'
-        }
-
-        stocks.append(metadata)
-
-print(f"✓ Parsed {len(stocks)} stocks from CSV")
-
-# Insert in batches
-batch_size = 500
-total_inserted = 0
-total_updated = 0
-total_failed = 0
-
-for i in range(0, len(stocks), batch_size):
-    batch = stocks[i:i + batch_size]
-    print(f"\nProcessing batch {i//batch_size + 1} ({len(batch)} stocks)...")
-
-    try:
-        result = supabase.table('stock_metadata').upsert(
-            batch,
-            on_conflict='symbol'
-        ).execute()
-
-        batch_count = len(batch)
-        total_inserted += batch_count
-        print(f"  ✓ Upserted {batch_count} stocks")
-
-    except Exception as e:
-        print(f"  ✗ Error: {str(e)}")
-        total_failed += len(batch)
-
-print("\n" + "=" * 70)
-print("SUMMARY")
-print("=" * 70)
-print(f"Total stocks processed: {len(stocks)}")
-print(f"✓ Successfully upserted: {total_inserted}")
-print(f"✗ Failed: {total_failed}")
-
-# Verify
-result = supabase.table('stock_metadata').select('symbol', count='exact').execute()
-print(f"\nTotal stocks in database: {result.count}")
-
-# Check specific missing stocks
-print("\n" + "-" * 70)
-print("Checking previously missing stocks:")
-print("-" * 70)
-
-test_symbols = ['INDUSINDBK', 'IKIO', 'SBIN', 'RPOWER']
-for symbol in test_symbols:
-    result = supabase.table('stock_metadata').select('*').eq('symbol', symbol).execute()
-    if result.data and len(result.data) > 0:
-        stock = result.data[0]
-        print(f"✓ {symbol}: {stock.get('company_name')}")
-        print(f"    Sector: {stock.get('sector', 'N/A')}")
-        print(f"    Industry: {stock.get('industry', 'N/A')}")
-    else:
-        print(f"✗ {symbol}: NOT FOUND")
-
-print("\n" + "=" * 70)
-print("✓ Import Complete!")
-print("=" * 70)
+import sys
+from typing import Dict, List, Optional
+
+
+def create_supabase_client():
+    """Create a Supabase client from the environment or .env.local"""
+    from supabase import create_client
+
+    supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL", "https://vhuvcsomnxntirnyxunj.supabase.co")
+    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_key:
+        with open('.env.local', 'r') as f:
+            for line in f:
+                if line.startswith('SUPABASE_SERVICE_ROLE_KEY='):
+                    supabase_key = line.split('=', 1)[1].strip()
+                    break
+
+    return create_client(supabase_url, supabase_key)
+
+
+def parse_metadata_csv(csv_file: str) -> List[Dict]:
+    """
+    Parse an NSE export (tab separated) into stock_metadata rows
+
+    Args:
+        csv_file: Path to the export file
+
+    Returns:
+        List of stock_metadata row dictionaries
+    """
+    stocks = []
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        for row in reader:
+            # Extract symbol from Ticker (NSE:SYMBOL -> SYMBOL)
+            ticker = row.get('Ticker', '')
+            symbol = ticker.split(':')[1] if ':' in ticker else ticker
+
+            if not symbol or not row.get('Security Name'):
+                continue
+
+            # Prepare metadata
+            current_price = float(row.get('Current Price', 0)) if row.get('Current Price') else None
+            market_cap = float(row['Market Capitalization']) if row.get('Market Capitalization') else None
+
+            # Calculate outstanding shares (in crores)
+            # Formula: outstanding_shares = market_cap / current_price
+            outstanding_shares = None
+            if market_cap and current_price and current_price > 0:
+                outstanding_shares = market_cap / current_price
+
+            metadata = {
+                'symbol': symbol.upper().strip(),
+                'company_name': row.get('Security Name', '').strip(),
+                'sector': row.get('Sector', None),
+                'industry': row.get('Industry', None),
+                'industry_type': row.get('Industry Type', None),
+                'industry_sub_group': row.get('Industry Subgroup Name', None),
+                'macro_economic_indicator': row.get('Macro-Economic Indicator', None),
+                'market_cap_category': row.get('Company Type', None),
+                'market_cap': market_cap,
+                'outstanding_shares': outstanding_shares,
+                'last_updated': 'now()'
+            }
+
+            # Only exports that carry the column set it, so others keep stored codes
+            if 'BSE Code' in row:
+                metadata['bse_code'] = (row['BSE Code'] or '').strip() or None
+
+            stocks.append(metadata)
+    return stocks
+
+
+def upsert_metadata(supabase, stocks: List[Dict], batch_size: int = 500,
+                    copy_writer=None) -> Dict[str, int]:
+    """
+    Upsert stock_metadata rows in batches
+
+    Args:
+        supabase: Supabase client
+        stocks: Rows from parse_metadata_csv
+        batch_size: Rows per upsert request
+        copy_writer: Optional CopyWriter; when given, every row is merged in
+            one COPY instead of batched PostgREST requests
+
+    Returns:
+        Dictionary with 'upserted' and 'failed' counts
+    """
+    if copy_writer is not None:
+        try:
+            copy_writer.upsert('stock_metadata', stocks)
+            print(f"\n  ✓ Upserted {len(stocks)} stocks with COPY "
+                  f"({copy_writer.last_timings['copy']:.2f}s copy, "
+                  f"{copy_writer.last_timings['merge']:.2f}s merge)")
+            return {'upserted': len(stocks), 'failed': 0}
+        except Exception as e:
+            print(f"\n  ✗ COPY failed, falling back to PostgREST: {e}")
+
+    total_upserted = 0
+    total_failed = 0
+
+    for i in range(0, len(stocks), batch_size):
+        batch = stocks[i:i + batch_size]
+        print(f"\nProcessing batch {i//batch_size + 1} ({len(batch)} stocks)...")
+
+        try:
+            supabase.table('stock_metadata').upsert(
+                batch,
+                on_conflict='symbol'
+            ).execute()
+
+            batch_count = len(batch)
+            total_upserted += batch_count
+            print(f"  ✓ Upserted {batch_count} stocks")
+
+        except Exception as e:
+            print(f"  ✗ Error: {str(e)}")
+            total_failed += len(batch)
+
+    return {'upserted': total_upserted, 'failed': total_failed}
+
+
+def verify_import(supabase, test_symbols: List[str]) -> None:
+    """Print the table size and the metadata for a few known symbols"""
+    result = supabase.table('stock_metadata').select('symbol', count='exact').execute()
+    print(f"\nTotal stocks in database: {result.count}")
+
+    # Check specific missing stocks
+    print("\n" + "-" * 70)
+    print("Checking previously missing stocks:")
+    print("-" * 70)
+
+    for symbol in test_symbols:
+        result = supabase.table('stock_metadata').select('*').eq('symbol', symbol).execute()
+        if result.data and len(result.data) > 0:
+            stock = result.data[0]
+            print(f"✓ {symbol}: {stock.get('company_name')}")
+            print(f"    Sector: {stock.get('sector', 'N/A')}")
+            print(f"    Industry: {stock.get('industry', 'N/A')}")
+        else:
+            print(f"✗ {symbol}: NOT FOUND")
+
+
+def main(csv_file: str = 'sample_import_template.csv', batch_size: int = 500,
+         copy_dsn: Optional[str] = None) -> None:
+    """Import stock metadata from an NSE export file (with COPY if copy_dsn is set)"""
+    supabase = create_supabase_client()
+    copy_writer = None
+    if copy_dsn:
+        from copy_writer import create_copy_writer
+        try:
+            copy_writer = create_copy_writer(copy_dsn)
+        except Exception as e:
+            print(f"⚠️  COPY backend unavailable, importing through PostgREST: {e}")
+
+    print("=" * 70)
+    print("NSE Stock Metadata Import")
+    print("=" * 70)
+
+    # Read CSV file
+    print(f"\nReading {csv_file}...")
+    stocks = parse_metadata_csv(csv_file)
+    print(f"✓ Parsed {len(stocks)} stocks from CSV")
+
+    # Insert in batches
+    totals = upsert_metadata(supabase, stocks, batch_size, copy_writer)
+    if copy_writer is not None:
+        copy_writer.close()
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(f"Total stocks processed: {len(stocks)}")
+    print(f"✓ Successfully upserted: {totals['upserted']}")
+    print(f"✗ Failed: {totals['failed']}")
+
+    verify_import(supabase, ['INDUSINDBK', 'IKIO', 'SBIN', 'RPOWER'])
+
+    print("\n" + "=" * 70)
+    print("✓ Import Complete!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,327 @@
+"""
+Intraday Bar Aggregation
+Aggregates polled quotes for held symbols into OHLCV bars kept in fixed-size
+NumPy ring buffers, and flushes completed bars to the intraday_bars table
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+BAR_INTERVALS = (60, 300)
+
+
+class BarRingBuffer:
+    """
+    OHLCV bars for a set of symbols, one fixed-capacity ring per symbol
+
+    Completed bars stay in the ring until drained; if they are not drained
+    before the ring wraps, the oldest are overwritten, so memory is bounded
+    by symbols x capacity however long the process runs.
+    """
+
+    def __init__(self, interval: int, capacity: int = 512):
+        """
+        Args:
+            interval: Bar length in seconds
+            capacity: Completed bars kept per symbol
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+
+        # Completed bars: (symbols, capacity)
+        self.bar_start = np.zeros((0, capacity), dtype=np.int64)
+        self.open = np.zeros((0, capacity), dtype=np.float64)
+        self.high = np.zeros((0, capacity), dtype=np.float64)
+        self.low = np.zeros((0, capacity), dtype=np.float64)
+        self.close = np.zeros((0, capacity), dtype=np.float64)
+        self.volume = np.zeros((0, capacity), dtype=np.int64)
+        # Bars written / drained per symbol (monotonic; slot = count % capacity)
+        self.written = np.zeros(0, dtype=np.int64)
+        self.drained = np.zeros(0, dtype=np.int64)
+
+        # Bar currently being built, per symbol (start -1 = none yet)
+        self.cur_start = np.zeros(0, dtype=np.int64)
+        self.cur_open = np.zeros(0, dtype=np.float64)
+        self.cur_high = np.zeros(0, dtype=np.float64)
+        self.cur_low = np.zeros(0, dtype=np.float64)
+        self.cur_close = np.zeros(0, dtype=np.float64)
+        self.cur_volume = np.zeros(0, dtype=np.int64)
+        self.last_cum_volume = np.zeros(0, dtype=np.int64)
+
+    def _add_symbol(self, symbol: str) -> int:
+        i = len(self.symbols)
+        self.index[symbol] = i
+        self.symbols.append(symbol)
+        for name in ('bar_start', 'open', 'high', 'low', 'close', 'volume'):
+            arr = getattr(self, name)
+            setattr(self, name, np.vstack([arr, np.zeros((1, self.capacity), dtype=arr.dtype)]))
+        for name in ('written', 'drained', 'cur_start', 'cur_open', 'cur_high',
+                     'cur_low', 'cur_close', 'cur_volume', 'last_cum_volume'):
+            arr = getattr(self, name)
+            setattr(self, name, np.append(arr, np.zeros(1, dtype=arr.dtype)))
+        self.cur_start[i] = -1
+        self.last_cum_volume[i] = -1
+        return i
+
+    def add_tick(self, symbol: str, price: float, cum_volume: Optional[int], ts: float) -> None:
+        """
+        Add one polled quote
+
+        Args:
+            symbol: NSE stock symbol
+            price: Last traded price
+            cum_volume: Day's cumulative traded volume (None if unknown; the
+                next known value is then measured from the last known one)
+            ts: Quote time in epoch seconds
+        """
+        i = self.index.get(symbol)
+        if i is None:
+            i = self._add_symbol(symbol)
+
+        # Volume is cumulative for the day and sampled at bar boundaries, so
+        # the traffic since the last sample belongs to the bar being closed
+        # (a drop means a new session)
+        if cum_volume is not None:
+            last = self.last_cum_volume[i]
+            if last >= 0 and cum_volume >= last and self.cur_start[i] >= 0:
+                self.cur_volume[i] += cum_volume - last
+            self.last_cum_volume[i] = cum_volume
+
+        start = int(ts) // self.interval * self.interval
+        if self.cur_start[i] != start:
+            if self.cur_start[i] >= 0:
+                self._complete(i)
+            self.cur_start[i] = start
+            self.cur_open[i] = self.cur_high[i] = self.cur_low[i] = price
+            self.cur_volume[i] = 0
+        else:
+            self.cur_high[i] = max(self.cur_high[i], price)
+            self.cur_low[i] = min(self.cur_low[i], price)
+        self.cur_close[i] = price
+
+    def _complete(self, i: int) -> None:
+        slot = self.written[i] % self.capacity
+        self.bar_start[i, slot] = self.cur_start[i]
+        self.open[i, slot] = self.cur_open[i]
+        self.high[i, slot] = self.cur_high[i]
+        self.low[i, slot] = self.cur_low[i]
+        self.close[i, slot] = self.cur_close[i]
+        self.volume[i, slot] = self.cur_volume[i]
+        self.written[i] += 1
+
+    def close_bars_before(self, ts: float) -> None:
+        """Complete open bars whose interval ended before ts (e.g. a symbol stopped ticking)"""
+        start = int(ts) // self.interval * self.interval
+        for i in np.nonzero((self.cur_start >= 0) & (self.cur_start < start))[0]:
+            self._complete(i)
+            self.cur_start[i] = -1
+
+    def pending(self) -> int:
+        """Completed bars not yet drained (capped at what the rings still hold)"""
+        return int(np.minimum(self.written - self.drained, self.capacity).sum())
+
+    def drain(self) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Get every completed bar not drained yet
+
+        The bars stay pending until mark_drained() is called with the
+        returned counters, so a failed write can simply be retried.
+
+        Returns:
+            Tuple of (intraday_bars rows, per-symbol write counters they cover)
+        """
+        rows = []
+        for i, symbol in enumerate(self.symbols):
+            first = max(self.drained[i], self.written[i] - self.capacity)
+            for n in range(first, self.written[i]):
+                slot = n % self.capacity
+                rows.append({
+                    'symbol': symbol,
+                    'interval_seconds': self.interval,
+                    'bar_start': datetime.fromtimestamp(int(self.bar_start[i, slot]), timezone.utc).isoformat(),
+                    'open': float(self.open[i, slot]),
+                    'high': float(self.high[i, slot]),
+                    'low': float(self.low[i, slot]),
+                    'close': float(self.close[i, slot]),
+                    'volume': int(self.volume[i, slot])
+                })
+        return rows, self.written.copy()
+
+    def mark_drained(self, written: np.ndarray) -> None:
+        """Record bars returned by drain() as stored"""
+        n = len(written)
+        self.drained[:n] = np.maximum(self.drained[:n], written)
+
+    def recent_bars(self, symbol: str, count: int) -> Dict[str, np.ndarray]:
+        """
+        Get the latest completed bars for a symbol, oldest first
+
+        Args:
+            symbol: NSE stock symbol
+            count: Maximum number of bars
+
+        Returns:
+            Dictionary of column name to array
+        """
+        i = self.index.get(symbol)
+        if i is None:
+            return {}
+        n = int(min(count, self.written[i], self.capacity))
+        slots = (np.arange(self.written[i] - n, self.written[i]) % self.capacity)
+        return {
+            'bar_start': self.bar_start[i, slots],
+            'open': self.open[i, slots],
+            'high': self.high[i, slots],
+            'low': self.low[i, slots],
+            'close': self.close[i, slots],
+            'volume': self.volume[i, slots],
+        }
+
+
+class IntradayPoller:
+    """Polls held symbols every few seconds and builds 1m/5m bars from the ticks"""
+
+    def __init__(self, updater, poll_seconds: int = 30, flush_batch_size: int = 500,
+                 symbols_refresh_seconds: int = 900, capacity: int = 512):
+        """
+        Args:
+            updater: SupabaseUpdater used to list held symbols and write bars
+            poll_seconds: Seconds between polls of the held symbols
+            flush_batch_size: Completed bars that trigger a write
+            symbols_refresh_seconds: How often the held symbol list is re-read
+            capacity: Completed bars kept per symbol per interval
+        """
+        from http_pool import NSESession
+        from nse_fetcher import NSEDataFetcher
+
+        self.updater = updater
+        # Own session: the poller runs on its own thread next to the hourly job
+        self.fetcher = NSEDataFetcher(session=NSESession())
+        self.poll_seconds = poll_seconds
+        self.flush_batch_size = flush_batch_size
+        self.symbols_refresh_seconds = symbols_refresh_seconds
+        self.buffers = [BarRingBuffer(interval, capacity) for interval in BAR_INTERVALS]
+        self.symbols: List[str] = []
+        self.symbols_loaded_at = 0.0
+        # symbol -> start of the shortest bar its traded volume was last sampled in
+        self.volume_sampled: Dict[str, int] = {}
+        self.last_flush = time.time()
+        self.stop_event = threading.Event()
+
+    def poll_once(self) -> None:
+        """Fetch every held symbol once and feed the quotes to the bar buffers"""
+        if time.time() - self.symbols_loaded_at > self.symbols_refresh_seconds:
+            self.symbols = self.updater.get_active_symbols_from_portfolio()
+            self.symbols_loaded_at = time.time()
+
+        for symbol in self.symbols:
+            if self.stop_event.is_set():
+                return
+            quote = self.fetcher.get_quote(symbol)
+            if quote:
+                self.add_ticks([quote], {symbol: self.sample_volume(symbol, quote.fetched_at)})
+                self.updater.publish_quote(quote)
+
+    def sample_volume(self, symbol: str, ts: float) -> Optional[int]:
+        """
+        Fetch the day's traded volume once per shortest bar, on its first tick
+
+        Quote.volume is the pre-open session volume, which stays flat all day,
+        so bar volume needs quote-equity's trade_info section. Sampling it only
+        at bar boundaries keeps the extra NSE requests to one per symbol per
+        bar rather than one per poll.
+
+        Args:
+            symbol: NSE stock symbol
+            ts: Quote time in epoch seconds
+
+        Returns:
+            Cumulative traded volume, or None if not due (or unavailable)
+        """
+        bar = int(ts) // BAR_INTERVALS[0] * BAR_INTERVALS[0]
+        if self.volume_sampled.get(symbol) == bar:
+            return None
+        self.volume_sampled[symbol] = bar
+        return self.fetcher.get_traded_volume(symbol)
+
+    def add_ticks(self, quotes: Iterable, volumes: Optional[Dict[str, Optional[int]]] = None) -> None:
+        """
+        Feed Quote records to every bar buffer
+
+        Args:
+            quotes: Quote records
+            volumes: Day's cumulative traded volume per symbol; symbols
+                without one add no volume for this tick
+        """
+        volumes = volumes or {}
+        for quote in quotes:
+            volume = volumes.get(quote.symbol)
+            for buffer in self.buffers:
+                buffer.add_tick(quote.symbol, quote.current_price, volume, quote.fetched_at)
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Write completed bars to intraday_bars once enough have built up
+
+        Args:
+            force: Write whatever is pending regardless of batch size
+
+        Returns:
+            Number of bars written
+        """
+        now = time.time()
+        for buffer in self.buffers:
+            buffer.close_bars_before(now - self.poll_seconds)
+        pending = sum(buffer.pending() for buffer in self.buffers)
+        if not pending or (not force and pending < self.flush_batch_size and now - self.last_flush < 60):
+            return 0
+
+        drained = [buffer.drain() for buffer in self.buffers]
+        rows = [row for buffer_rows, _ in drained for row in buffer_rows]
+        try:
+            for i in range(0, len(rows), self.flush_batch_size):
+                self.updater.supabase.table('intraday_bars').upsert(
+                    rows[i:i + self.flush_batch_size], on_conflict='symbol,interval_seconds,bar_start'
+                ).execute()
+        except Exception as e:
+            # Bars stay pending and go out with the next flush
+            print(f"❌ Error writing {len(rows)} intraday bars: {e}")
+            return 0
+        for buffer, (_, written) in zip(self.buffers, drained):
+            buffer.mark_drained(written)
+        self.last_flush = now
+        return len(rows)
+
+    def run(self, should_poll=lambda: True) -> None:
+        """
+        Poll until stop() is called
+
+        Args:
+            should_poll: Called before each poll; polling is skipped while it
+                returns False (e.g. outside trading hours)
+        """
+        while not self.stop_event.is_set():
+            started = time.time()
+            if should_poll():
+                self.poll_once()
+                self.flush()
+            else:
+                self.flush(force=True)
+            self.stop_event.wait(max(0.0, self.poll_seconds - (time.time() - started)))
+        self.flush(force=True)
+
+    def start(self, should_poll=lambda: True) -> threading.Thread:
+        """Run the poller on a daemon thread"""
+        thread = threading.Thread(target=self.run, args=(should_poll,),
+                                  name='intraday-poller', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self.stop_event.set()
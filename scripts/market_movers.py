@@ -0,0 +1,102 @@
+"""
+Market Movers
+Tracks the day's top gainers and losers, market-wide and per sector, in
+bounded heaps fed as quotes stream through an update cycle
+"""
+
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+MARKET = 'ALL'
+TOP_K = 10
+
+
+class TopK:
+    """The k items with the largest keys seen so far, in O(k) memory"""
+
+    def __init__(self, k: int):
+        self.k = k
+        # Min-heap, so the smallest kept key is the one a new item must beat
+        self.heap: List[Tuple[float, str, Dict]] = []
+
+    def push(self, key: float, tiebreak: str, item: Dict) -> None:
+        """
+        Offer an item; it is kept only if it ranks in the top k
+
+        Args:
+            key: Ranking value, larger is better
+            tiebreak: Orders equal keys (the symbol), so results are stable
+            item: Payload kept with the key
+        """
+        entry = (key, tiebreak, item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self) -> List[Dict]:
+        """Kept items, best first"""
+        return [item for _, _, item in sorted(self.heap, key=lambda e: e[:2], reverse=True)]
+
+
+class MoversTracker:
+    """Top-k gainers and losers for the whole market and for each sector"""
+
+    def __init__(self, sectors: Optional[Dict[str, str]] = None, k: int = TOP_K):
+        """
+        Args:
+            sectors: Symbol to sector (from stock_metadata); symbols without
+                one only count towards the market-wide lists
+            k: Movers kept per list
+        """
+        self.sectors = sectors or {}
+        self.k = k
+        self.gainers: Dict[str, TopK] = {}
+        self.losers: Dict[str, TopK] = {}
+        self.seen = 0
+
+    def add(self, quote) -> None:
+        """Offer one Quote to the market and sector heaps"""
+        change = quote.change_percent
+        if not quote.current_price or not change:
+            return
+        self.seen += 1
+        item = {
+            'symbol': quote.symbol,
+            'company_name': quote.company_name,
+            'price': quote.current_price,
+            'change_percent': change
+        }
+        groups = [MARKET]
+        if self.sectors.get(quote.symbol):
+            groups.append(self.sectors[quote.symbol])
+
+        # Losers rank by the most negative change, so their key is negated
+        heaps, key = (self.gainers, change) if change > 0 else (self.losers, -change)
+        for group in groups:
+            if group not in heaps:
+                heaps[group] = TopK(self.k)
+            heaps[group].push(key, quote.symbol, item)
+
+    def rows(self, as_of: Optional[str] = None) -> List[Dict]:
+        """
+        Serialise every list to market_movers rows
+
+        Args:
+            as_of: Snapshot time (defaults to now)
+
+        Returns:
+            One row per sector and direction
+        """
+        as_of = as_of or datetime.now(timezone.utc).isoformat()
+        rows = []
+        for direction, heaps in (('gainers', self.gainers), ('losers', self.losers)):
+            for group, top in heaps.items():
+                rows.append({
+                    'sector': group,
+                    'direction': direction,
+                    'movers': top.items(),
+                    'as_of': as_of
+                })
+        return rows
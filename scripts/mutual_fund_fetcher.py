@@ -4,15 +4,18 @@ Fetches NAV data for Indian mutual funds from AMFI
 """
 
 import requests
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
 import json
 
+from http_pool import create_pooled_session
+
 class MutualFundFetcher:
     """Fetch mutual fund NAV data from AMFI"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.base_url = "https://api.mfapi.in"
+        self.session = session or create_pooled_session()
     
     def get_scheme_details(self, scheme_code: str) -> Optional[Dict]:
         """
@@ -26,14 +29,15 @@ class MutualFundFetcher:
         """
         try:
             url = f"{self.base_url}/mf/{scheme_code}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
             data = response.json()
             
             if data.get('status') == 'SUCCESS':
-                latest_nav = data['data'][0] if data.get('data') else {}
-                
+                nav_history = data.get('data') or []
+                latest_nav = nav_history[0] if nav_history else {}
+
                 return {
                     'scheme_code': scheme_code,
                     'scheme_name': data.get('meta', {}).get('scheme_name', ''),
@@ -41,15 +45,42 @@ class MutualFundFetcher:
                     'scheme_type': data.get('meta', {}).get('scheme_type', ''),
                     'scheme_category': data.get('meta', {}).get('scheme_category', ''),
                     'nav': float(latest_nav.get('nav', 0)),
-                    'nav_date': latest_nav.get('date', ''),
+                    'nav_date': _parse_nav_date(latest_nav.get('date', '')),
                     'last_updated': datetime.now().isoformat(),
-                    'raw_data': data
+                    # Full history goes to mutual_fund_nav_history, not raw_data
+                    'nav_history': nav_history,
+                    'raw_data': {'meta': data.get('meta', {}), 'latest': latest_nav}
                 }
             return None
         except Exception as e:
             print(f"Error fetching scheme {scheme_code}: {e}")
             return None
     
+    @staticmethod
+    def iter_nav_history(scheme_code: str, nav_history: List[Dict],
+                         after: Optional[date] = None) -> Iterator[Dict]:
+        """
+        Turn mfapi NAV entries into mutual_fund_nav_history rows
+
+        Args:
+            scheme_code: AMFI scheme code
+            nav_history: mfapi 'data' list (newest first)
+            after: Only yield NAV dates after this one (the stored high-water mark)
+
+        Yields:
+            Rows with scheme_code, nav_date (ISO) and nav
+        """
+        for entry in nav_history:
+            try:
+                nav_date = datetime.strptime(entry['date'], '%d-%m-%Y').date()
+                nav = float(entry['nav'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if after is not None and nav_date <= after:
+                # mfapi lists newest first, so everything after this is stored already
+                break
+            yield {'scheme_code': scheme_code, 'nav_date': nav_date.isoformat(), 'nav': nav}
+
     def get_all_schemes(self) -> List[Dict]:
         """
         Get list of all mutual fund schemes
@@ -86,6 +117,14 @@ class MutualFundFetcher:
         ]
 
 
+def _parse_nav_date(value: str) -> Optional[str]:
+    """Convert an mfapi date (DD-MM-YYYY) to ISO format"""
+    try:
+        return datetime.strptime(value, '%d-%m-%Y').date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
 def main():
     """Example usage"""
     fetcher = MutualFundFetcher()
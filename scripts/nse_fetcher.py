@@ -3,20 +3,41 @@ NSE Data Fetcher for Portfolio Tracker
 Fetches live stock prices and market data from NSE India using nsepython library
 """
 
-from nsepython import *
 import json
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import time
 
+from http_pool import NSESession
+from quote import Quote
+
 class NSEDataFetcher:
     """Fetch live data from NSE India using nsepython"""
 
-    def __init__(self):
-        """Initialize NSE data fetcher"""
-        pass
+    def __init__(self, session: Optional[NSESession] = None, hedged=None):
+        """
+        Initialize NSE data fetcher
 
-    def get_quote(self, symbol: str) -> Optional[Dict]:
+        Args:
+            session: Shared NSE session; a long-lived one keeps connections
+                and cookies warm across scheduled runs
+            hedged: Optional HedgedQuoteFetcher; quotes then go through its
+                NSE-first, BSE-hedged policy instead of the session
+        """
+        self.session = session or NSESession()
+        self.hedged = hedged
+
+    def _fetch_equity(self, symbol: str) -> Optional[Dict]:
+        """Fetch the raw quote-equity payload, falling back to nse_eq"""
+        try:
+            return self.session.get_json('/api/quote-equity', params={'symbol': symbol})
+        except Exception as e:
+            print(f"Pooled NSE request failed for {symbol} ({e}), retrying via nsepython")
+            # nsepython pulls in pandas, so only import it when it's needed
+            from nsepython import nse_eq
+            return nse_eq(symbol)
+
+    def get_quote(self, symbol: str) -> Optional[Quote]:
         """
         Get live quote for a stock symbol
 
@@ -24,46 +45,44 @@ class NSEDataFetcher:
             symbol: NSE stock symbol (e.g., 'RELIANCE', 'TCS')
 
         Returns:
-            Dictionary containing stock quote data
+            Quote record for the symbol
         """
+        if self.hedged is not None:
+            return self.hedged.get_quote(symbol)
         try:
-            # Fetch quote using nsepython
-            data = nse_eq(symbol)
+            data = self._fetch_equity(symbol)
 
             if not data:
                 print(f"No data returned for {symbol}")
                 return None
 
-            # Extract price info from nsepython response
-            price_info = data.get('priceInfo', {})
-            info = data.get('info', {})
-            pre_open = data.get('preOpenMarket', {})
-            metadata = data.get('metadata', {})
-
-            current_price = float(price_info.get('lastPrice', 0))
-            previous_close = float(price_info.get('previousClose', 0))
-            change_percent = float(price_info.get('pChange', 0))
-
-            return {
-                'symbol': symbol,
-                'company_name': info.get('companyName', metadata.get('companyName', '')),
-                'isin': info.get('isin', metadata.get('isin', '')),
-                'current_price': current_price,
-                'previous_close': previous_close,
-                'open': float(price_info.get('open', 0)),
-                'high': float(price_info.get('intraDayHighLow', {}).get('max', 0)),
-                'low': float(price_info.get('intraDayHighLow', {}).get('min', 0)),
-                'change': float(price_info.get('change', 0)),
-                'change_percent': change_percent,
-                'volume': int(pre_open.get('totalTradedVolume', 0)),
-                'last_updated': datetime.now().isoformat(),
-                'raw_data': data
-            }
+            return Quote.from_nse(symbol, data)
         except Exception as e:
             print(f"Error fetching quote for {symbol}: {e}")
             return None
 
-    def get_multiple_quotes(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+    def get_traded_volume(self, symbol: str) -> Optional[int]:
+        """
+        Get the day's cumulative traded quantity for a stock
+
+        The quote-equity payload only carries the pre-open volume; the
+        running total for the session is in its trade_info section.
+
+        Args:
+            symbol: NSE stock symbol
+
+        Returns:
+            Shares traded so far today, or None if unavailable
+        """
+        try:
+            data = self.session.get_json('/api/quote-equity',
+                                         params={'symbol': symbol, 'section': 'trade_info'})
+        except Exception as e:
+            print(f"Error fetching traded volume for {symbol}: {e}")
+            return None
+        return _to_int((data or {}).get('securityWiseDP', {}).get('quantityTraded'))
+
+    def get_multiple_quotes(self, symbols: List[str]) -> Dict[str, Optional[Quote]]:
         """
         Get quotes for multiple symbols
 
@@ -71,13 +90,23 @@ class NSEDataFetcher:
             symbols: List of NSE stock symbols
 
         Returns:
-            Dictionary mapping symbols to their quote data
+            Dictionary mapping symbols to their Quote records
+        """
+        return dict(self.iter_quotes(symbols))
+
+    def iter_quotes(self, symbols: Iterable[str]) -> Iterator[Tuple[str, Optional[Quote]]]:
+        """
+        Fetch quotes one at a time, yielding each as soon as it arrives
+
+        Args:
+            symbols: NSE stock symbols
+
+        Yields:
+            (symbol, Quote or None) tuples
         """
-        results = {}
         for symbol in symbols:
-            results[symbol] = self.get_quote(symbol)
+            yield symbol, self.get_quote(symbol)
             time.sleep(1)  # Avoid rate limiting
-        return results
 
     def get_index_data(self, index_name: str = "NIFTY 50") -> Optional[Dict]:
         """
@@ -100,6 +129,7 @@ class NSEDataFetcher:
             index = index_map.get(index_name, index_name)
 
             # Fetch index data using nsepython
+            from nsepython import nse_get_index_quote
             data = nse_get_index_quote(index)
 
             if data:
@@ -115,6 +145,47 @@ class NSEDataFetcher:
             print(f"Error fetching index data: {e}")
             return None
 
+    def get_all_indices(self) -> List[Dict]:
+        """
+        Get a snapshot of every NSE index in a single request
+
+        Returns:
+            List of index_data rows, one per index
+        """
+        try:
+            data = self.session.get_json('/api/allIndices')
+        except Exception as e:
+            print(f"Error fetching all indices: {e}")
+            return []
+
+        as_of = _parse_nse_timestamp(data.get('timestamp'))
+        rows = []
+        for item in data.get('data', []):
+            current_value = _to_float(item.get('last'))
+            if not item.get('index') or current_value is None:
+                continue
+            rows.append({
+                'index_name': item['index'],
+                'index_symbol': item.get('indexSymbol'),
+                'current_value': current_value,
+                'previous_close': _to_float(item.get('previousClose')),
+                'open': _to_float(item.get('open')),
+                'high': _to_float(item.get('high')),
+                'low': _to_float(item.get('low')),
+                'change': _to_float(item.get('variation')),
+                'change_percent': _to_float(item.get('percentChange')),
+                'year_high': _to_float(item.get('yearHigh')),
+                'year_low': _to_float(item.get('yearLow')),
+                'pe_ratio': _to_float(item.get('pe')),
+                'pb_ratio': _to_float(item.get('pb')),
+                'dividend_yield': _to_float(item.get('dy')),
+                'advances': _to_int(item.get('advances')),
+                'declines': _to_int(item.get('declines')),
+                'unchanged': _to_int(item.get('unchanged')),
+                'as_of': as_of
+            })
+        return rows
+
     def search_symbol(self, query: str) -> List[Dict]:
         """
         Search for stocks by company name or symbol
@@ -134,6 +205,30 @@ class NSEDataFetcher:
             return []
 
 
+def _to_float(value) -> Optional[float]:
+    """Convert an NSE number (may be '-', '' or comma separated) to float"""
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _parse_nse_timestamp(value: Optional[str]) -> str:
+    """Convert an NSE timestamp like '17-Oct-2026 15:30' (IST) to ISO format"""
+    ist = timezone(timedelta(hours=5, minutes=30))
+    for fmt in ('%d-%b-%Y %H:%M:%S', '%d-%b-%Y %H:%M'):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=ist).isoformat()
+        except (TypeError, ValueError):
+            continue
+    return datetime.now(ist).isoformat(timespec='seconds')
+
+
 def main():
     """Example usage"""
     fetcher = NSEDataFetcher()
@@ -142,10 +237,10 @@ def main():
     print("Fetching RELIANCE quote...")
     quote = fetcher.get_quote("RELIANCE")
     if quote:
-        print(f"Symbol: {quote['symbol']}")
-        print(f"Company: {quote['company_name']}")
-        print(f"Price: ₹{quote['current_price']}")
-        print(f"Change: {quote['change_percent']}%")
+        print(f"Symbol: {quote.symbol}")
+        print(f"Company: {quote.company_name}")
+        print(f"Price: ₹{quote.current_price}")
+        print(f"Change: {quote.change_percent}%")
         print()
 
     # Example 2: Get multiple quotes
@@ -154,7 +249,7 @@ def main():
     quotes = fetcher.get_multiple_quotes(symbols)
     for symbol, data in quotes.items():
         if data:
-            print(f"{symbol}: ₹{data['current_price']} ({data['change_percent']}%)")
+            print(f"{symbol}: ₹{data.current_price} ({data.change_percent}%)")
     print()
 
     # Example 3: Get index data
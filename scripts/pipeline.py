@@ -0,0 +1,159 @@
+"""
+Streaming Pipeline
+Runs fetch -> transform -> batched write stages concurrently over bounded
+queues, so rows reach the database while fetching continues and memory
+stays flat however many items flow through
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    """Counters collected while a pipeline runs"""
+    fetched: int = 0
+    transformed: int = 0
+    written: int = 0
+    batches: int = 0
+    max_queue_depth: int = 0
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when another stage has failed"""
+    pass
+
+
+class StreamingPipeline:
+    """Fetch, transform and batched-write stages joined by bounded queues"""
+
+    def __init__(self, transform: Callable[[Any], Optional[Any]],
+                 write_batch: Callable[[List[Any]], None],
+                 batch_size: int = 50, queue_size: int = 100,
+                 flush_interval: float = 5.0):
+        """
+        Args:
+            transform: Turns a fetched item into a row; returning None drops it
+            write_batch: Writes a list of rows
+            batch_size: Rows per write
+            queue_size: Capacity of each queue; a full queue blocks the
+                upstream stage (backpressure)
+            flush_interval: Seconds after which a partial batch is written
+        """
+        self.transform = transform
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+
+    def run(self, source: Iterable) -> PipelineStats:
+        """
+        Stream every item from source through the pipeline
+
+        Args:
+            source: Iterable of fetched items (usually a generator doing I/O)
+
+        Returns:
+            PipelineStats for the run
+        """
+        stats = PipelineStats()
+        fetched_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        rows_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        def put(q: queue.Queue, item) -> None:
+            while True:
+                if stop.is_set():
+                    raise PipelineStopped()
+                try:
+                    q.put(item, timeout=0.5)
+                except queue.Full:
+                    continue
+                stats.max_queue_depth = max(stats.max_queue_depth, q.qsize())
+                return
+
+        def get(q: queue.Queue, timeout: Optional[float] = None):
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                if stop.is_set():
+                    raise PipelineStopped()
+                wait = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+                if wait <= 0:
+                    raise queue.Empty()
+                try:
+                    return q.get(timeout=wait)
+                except queue.Empty:
+                    continue
+
+        def stage(body: Callable[[], None]) -> Callable[[], None]:
+            def target():
+                try:
+                    body()
+                except PipelineStopped:
+                    pass
+                except BaseException as e:
+                    errors.append(e)
+                    stop.set()
+            return target
+
+        def fetch():
+            for item in source:
+                stats.fetched += 1
+                put(fetched_q, item)
+            put(fetched_q, _DONE)
+
+        def transform():
+            while True:
+                item = get(fetched_q)
+                if item is _DONE:
+                    break
+                row = self.transform(item)
+                if row is not None:
+                    stats.transformed += 1
+                    put(rows_q, row)
+            put(rows_q, _DONE)
+
+        def write():
+            batch: List[Any] = []
+            batch_started = time.monotonic()
+            while True:
+                try:
+                    row = get(rows_q, timeout=self.flush_interval)
+                except queue.Empty:
+                    row = None
+                if row is _DONE:
+                    break
+                if row is not None:
+                    if not batch:
+                        batch_started = time.monotonic()
+                    batch.append(row)
+                if batch and (len(batch) >= self.batch_size or
+                              time.monotonic() - batch_started >= self.flush_interval):
+                    self._flush(batch, stats)
+                    batch = []
+            if batch:
+                self._flush(batch, stats)
+
+        threads = [threading.Thread(target=stage(fetch), name='pipeline-fetch', daemon=True),
+                   threading.Thread(target=stage(transform), name='pipeline-transform', daemon=True)]
+        for thread in threads:
+            thread.start()
+        stage(write)()
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        return stats
+
+    def _flush(self, batch: List[Any], stats: PipelineStats) -> None:
+        self.write_batch(batch)
+        stats.written += len(batch)
+        stats.batches += 1
@@ -0,0 +1,216 @@
+"""
+Portfolio Returns
+Precomputes the daily time-weighted return of every portfolio and family,
+with the benchmark's return over the same days, into portfolio_returns_daily
+so charts read a stored series instead of recomputing it
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from price_history import PriceHistory, asset_key, fetch_all
+from quote import IST
+from risk_engine import align_prices
+from twr_engine import benchmark_returns, build_positions, scope_matrix, time_weighted_returns
+
+WRITE_BATCH_SIZE = 1000
+# Stored series are rewritten from scratch when their last return or benchmark return
+# drifts more than this (a backdated transaction or corrected price changes the whole
+# chain, and benchmark history arriving fills in a benchmark stored as NULL)
+REWRITE_TOLERANCE = 1e-6
+
+
+class PortfolioReturnsUpdater:
+    """Computes daily TWR series for all portfolios at once and stores new days"""
+
+    def __init__(self, supabase, history: Optional[PriceHistory] = None):
+        """
+        Args:
+            supabase: Supabase client
+            history: Price history to share with other analytics (a new one
+                benchmarked against NIFTY 50 is created if omitted)
+        """
+        self.supabase = supabase
+        self.history = history or PriceHistory(supabase)
+        # (scope, scope_id) -> (last stored date, its twr, its benchmark return or NaN);
+        # read from the table on first run
+        self.stored: Optional[Dict[Tuple[str, str], Tuple[date, float, float]]] = None
+
+    def load_stored(self) -> Dict[Tuple[str, str], Tuple[date, float, float]]:
+        """Latest stored day, return and benchmark return per scope"""
+        result = self.supabase.rpc('get_return_high_water_marks').execute()
+        return {
+            (row['scope'], row['scope_id']): (
+                date.fromisoformat(row['last_date']), float(row['twr']),
+                np.nan if row.get('benchmark_return') is None else float(row['benchmark_return'])
+            )
+            for row in result.data or []
+        }
+
+    def compute(self, today: date) -> Dict:
+        """
+        Compute daily returns for every portfolio and family up to yesterday
+
+        Args:
+            today: Current IST date; its prices are not final, so it is excluded
+
+        Returns:
+            Dictionary with dates, scopes [(scope, scope_id, user_id)], and
+            (days, scopes) arrays value, flow, daily, twr and benchmark;
+            empty if there is nothing to compute
+        """
+        investments = fetch_all(lambda: self.supabase.table('investments')
+                                .select('id, portfolio_id, investment_type, symbol')
+                                .in_('investment_type', ['stock', 'etf', 'mutual_fund'])
+                                .not_.is_('symbol', 'null')
+                                .order('id'))
+        owners = {p['id']: p['user_id'] for p in fetch_all(
+            lambda: self.supabase.table('portfolios').select('id, user_id').order('id'))}
+        investments = [inv for inv in investments if owners.get(inv['portfolio_id'])]
+        wanted = {inv['id'] for inv in investments}
+        transactions = [
+            txn for txn in fetch_all(lambda: self.supabase.table('transactions')
+                                     .select('investment_id, transaction_type, quantity, price, '
+                                             'total_amount, transaction_date')
+                                     .lt('transaction_date', today.isoformat())
+                                     .order('id'))
+            if txn['investment_id'] in wanted
+        ]
+        if not transactions:
+            return {}
+
+        symbols = sorted({inv['symbol'] for inv in investments if inv['investment_type'] != 'mutual_fund'})
+        codes = sorted({inv['symbol'] for inv in investments if inv['investment_type'] == 'mutual_fund'})
+        self.history.load(symbols, codes, before=today)
+
+        trade_dates = {date.fromisoformat(str(t['transaction_date'])) for t in transactions}
+        dates, assets, prices = align_prices(self.history.series, extra_dates=trade_dates)
+        start = bisect_left(dates, min(trade_dates))
+        dates, prices = dates[start:], prices[start:]
+        column = {asset: j for j, asset in enumerate(assets)}
+
+        ids = [inv['id'] for inv in investments]
+        quantity, inv_flows, trade_price = build_positions(dates, ids, transactions)
+
+        # Market price per investment, falling back to its last trade price
+        # for days before the symbol has any stored history
+        market = np.full(quantity.shape, np.nan)
+        for i, inv in enumerate(investments):
+            j = column.get(asset_key(inv['investment_type'], inv['symbol']))
+            if j is not None:
+                market[:, i] = prices[:, j]
+        price = np.where(np.isnan(market), trade_price, market)
+        inv_values = np.where(quantity != 0, quantity * np.nan_to_num(price), 0.0)
+
+        scope_users: Dict[Tuple[str, str], str] = {}
+        memberships = []
+        for inv in investments:
+            user_id = owners[inv['portfolio_id']]
+            member_of = [('portfolio', inv['portfolio_id']), ('family', user_id)]
+            for scope in member_of:
+                scope_users[scope] = user_id
+            memberships.append(member_of)
+        scopes = sorted(scope_users)
+        membership = scope_matrix(memberships, scopes)
+
+        values = inv_values @ membership
+        flows = inv_flows @ membership
+        daily, twr = time_weighted_returns(values, flows)
+
+        bench_key = self.history.benchmark_key
+        bench = (prices[:, column[bench_key]] if bench_key in column
+                 else np.full(len(dates), np.nan))
+        active = (values > 0) | (flows != 0)
+        return {
+            'dates': dates,
+            'scopes': [(scope, scope_id, scope_users[(scope, scope_id)]) for scope, scope_id in scopes],
+            'active': active,
+            'value': values,
+            'flow': flows,
+            'daily': daily,
+            'twr': twr,
+            'benchmark': benchmark_returns(bench, active, twr),
+        }
+
+    def update(self) -> int:
+        """
+        Recompute every series and store the days not stored yet
+
+        Returns:
+            Number of rows written
+        """
+        today = datetime.now(IST).date()
+        result = self.compute(today)
+        if not result:
+            return 0
+        if self.stored is None:
+            self.stored = self.load_stored()
+
+        dates = result['dates']
+        rows: List[Dict] = []
+        for k, (scope, scope_id, user_id) in enumerate(result['scopes']):
+            active = result['active'][:, k]
+            if not active.any():
+                continue
+            first = int(active.argmax())
+            stored = self.stored.get((scope, scope_id))
+            if stored is not None:
+                i = bisect_left(dates, stored[0])
+                if (i < len(dates) and dates[i] == stored[0]
+                        and abs(result['twr'][i, k] - stored[1]) <= REWRITE_TOLERANCE
+                        and _same_benchmark(result['benchmark'][i, k], stored[2])):
+                    first = max(first, i + 1)
+            for i in range(first, len(dates)):
+                rows.append(self._to_row(scope, scope_id, user_id, dates[i], result, i, k))
+
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            self.supabase.table('portfolio_returns_daily').upsert(
+                rows[i:i + WRITE_BATCH_SIZE], on_conflict='scope,scope_id,return_date'
+            ).execute()
+
+        last = len(dates) - 1
+        for k, (scope, scope_id, _) in enumerate(result['scopes']):
+            if result['active'][:, k].any():
+                self.stored[(scope, scope_id)] = (dates[last], float(np.round(result['twr'][last, k], 6)),
+                                                  float(np.round(result['benchmark'][last, k], 6)))
+        self._print_summary(result)
+        return len(rows)
+
+    @staticmethod
+    def _to_row(scope: str, scope_id: str, user_id: str, day: date, result: Dict,
+                i: int, k: int) -> Dict:
+        benchmark = float(result['benchmark'][i, k])
+        return {
+            'user_id': user_id,
+            'portfolio_id': scope_id if scope == 'portfolio' else None,
+            'scope': scope,
+            'scope_id': scope_id,
+            'return_date': day.isoformat(),
+            'portfolio_value': round(float(result['value'][i, k]), 2),
+            'net_flow': round(float(result['flow'][i, k]), 2),
+            'daily_return': round(float(result['daily'][i, k]), 6),
+            'twr': round(float(result['twr'][i, k]), 6),
+            'benchmark_return': None if np.isnan(benchmark) else round(benchmark, 6)
+        }
+
+    def _print_summary(self, result: Dict) -> None:
+        latest = defaultdict(int)
+        for k, (scope, _, _) in enumerate(result['scopes']):
+            twr, bench = result['twr'][-1, k], result['benchmark'][-1, k]
+            if not np.isnan(bench):
+                latest[scope, twr >= bench] += 1
+        for scope in ('portfolio', 'family'):
+            ahead, behind = latest[scope, True], latest[scope, False]
+            if ahead or behind:
+                print(f"   {scope}: {ahead} ahead of {self.history.benchmark}, {behind} behind")
+
+
+def _same_benchmark(computed: float, stored: float) -> bool:
+    """Whether a stored benchmark return (NaN for NULL) still matches the computed one"""
+    if np.isnan(computed) or np.isnan(stored):
+        return np.isnan(computed) and np.isnan(stored)
+    return abs(computed - stored) <= REWRITE_TOLERANCE
@@ -0,0 +1,173 @@
+"""
+Portfolio Risk Metrics
+Loads daily price/NAV/index history from Supabase, runs the risk engine for
+every portfolio and family, and stores the results in portfolio_risk_metrics
+
+Metrics only use completed trading days. A long-lived updater (the
+--schedule daemon) keeps the engine's window state and pushes each new day
+forward. A fresh process (the hourly `cli.py update` cron) has no state, so
+it recomputes once per trading day and skips runs when the stored metrics
+already cover the latest completed day; holdings edited during the day are
+picked up by the next day's run.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from price_history import PriceHistory, asset_key, fetch_all
+from quote import IST
+from risk_engine import PORTFOLIO_COLUMN, RiskEngine, align_prices
+
+RISK_WINDOWS = (21, 63, 252)
+
+
+class PortfolioRiskUpdater:
+    """Computes and stores risk metrics; keeps history and window state between runs"""
+
+    def __init__(self, supabase, windows: Sequence[int] = RISK_WINDOWS,
+                 history: Optional[PriceHistory] = None):
+        """
+        Args:
+            supabase: Supabase client
+            windows: Window lengths in trading days
+            history: Price history to share with other analytics (a new one
+                benchmarked against NIFTY 50 is created if omitted)
+        """
+        self.supabase = supabase
+        self.windows = tuple(windows)
+        self.history = history or PriceHistory(supabase)
+        self.engine = RiskEngine()
+
+    def update(self) -> int:
+        """
+        Recompute risk metrics for every portfolio and family and store them
+
+        Returns:
+            Number of metric rows written (0 if already current)
+        """
+        today = datetime.now(IST).date()
+        if not self.engine.cache:
+            stored, completed = self.stored_as_of(), self.latest_completed_day(today)
+            if stored is not None and completed is not None and stored >= completed:
+                print(f"📐 Risk metrics already computed through {stored.isoformat()}")
+                return 0
+
+        holdings = fetch_all(lambda: self.supabase.table('investments')
+                             .select('id, portfolio_id, investment_type, symbol, quantity')
+                             .in_('investment_type', ['stock', 'etf', 'mutual_fund'])
+                             .not_.is_('symbol', 'null')
+                             .order('id'))
+        owners = {p['id']: p['user_id'] for p in fetch_all(
+            lambda: self.supabase.table('portfolios').select('id, user_id').order('id'))}
+
+        symbols = sorted({h['symbol'] for h in holdings if h['investment_type'] != 'mutual_fund'})
+        codes = sorted({h['symbol'] for h in holdings if h['investment_type'] == 'mutual_fund'})
+        self.history.load(symbols, codes, before=today)
+
+        bench_key = self.history.benchmark_key
+        if not self.history.series.get(bench_key):
+            print(f"⚠️  No {self.history.benchmark} history yet; skipping risk metrics")
+            return 0
+
+        dates, assets, prices = align_prices(self.history.series)
+        column = {asset: j for j, asset in enumerate(assets)}
+        bench = prices[:, column[bench_key]]
+        latest = prices[-1]
+
+        # Position value per scope: each portfolio, and each user's whole family
+        scopes: Dict[Tuple[str, str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for h in holdings:
+            key = asset_key(h['investment_type'], h['symbol'])
+            user_id = owners.get(h['portfolio_id'])
+            if key not in column or user_id is None or np.isnan(latest[column[key]]):
+                continue
+            value = float(h.get('quantity') or 0) * float(latest[column[key]])
+            if value <= 0:
+                continue
+            scopes[('portfolio', h['portfolio_id'], user_id)][key] += value
+            scopes[('family', user_id, user_id)][key] += value
+
+        rows = []
+        as_of = dates[-1].isoformat()
+        for (scope, scope_id, user_id), values in scopes.items():
+            keys = sorted(values)
+            cols = [column[k] for k in keys]
+            weights = np.array([values[k] for k in keys])
+            for window in self.windows:
+                metrics = self.engine.compute(f"{scope}:{scope_id}", window, dates, keys,
+                                              prices[:, cols], bench, weights)
+                rows.append(self._to_row(scope, scope_id, user_id, window, as_of, metrics))
+
+        for i in range(0, len(rows), 500):
+            self.supabase.table('portfolio_risk_metrics').upsert(
+                rows[i:i + 500], on_conflict='scope,scope_id,window_days'
+            ).execute()
+        return len(rows)
+
+    def stored_as_of(self) -> Optional[date]:
+        """Latest day the stored risk metrics were computed through"""
+        rows = (self.supabase.table('portfolio_risk_metrics').select('as_of')
+                .order('as_of', desc=True).limit(1).execute().data)
+        return date.fromisoformat(rows[0]['as_of']) if rows else None
+
+    def latest_completed_day(self, today: date) -> Optional[date]:
+        """Latest day before today with a stock close or a benchmark snapshot"""
+        days = []
+        rows = (self.supabase.table('stock_price_history').select('price_date')
+                .lt('price_date', today.isoformat())
+                .order('price_date', desc=True).limit(1).execute().data)
+        if rows:
+            days.append(date.fromisoformat(rows[0]['price_date']))
+        rows = (self.supabase.table('index_data_history').select('as_of')
+                .eq('index_name', self.history.benchmark)
+                .lt('as_of', datetime.combine(today, time(), IST).isoformat())
+                .order('as_of', desc=True).limit(1).execute().data)
+        if rows:
+            days.append(datetime.fromisoformat(rows[0]['as_of']).astimezone(IST).date())
+        return max(days) if days else None
+
+    @staticmethod
+    def _to_row(scope: str, scope_id: str, user_id: str, window: int, as_of: str,
+                metrics: Dict) -> Dict:
+        def num(value) -> Optional[float]:
+            value = float(value)
+            return None if np.isnan(value) or np.isinf(value) else round(value, 4)
+
+        row = {
+            'user_id': user_id,
+            'portfolio_id': scope_id if scope == 'portfolio' else None,
+            'scope': scope,
+            'scope_id': scope_id,
+            'window_days': window,
+            'as_of': as_of,
+            'volatility': None,
+            'beta': None,
+            'max_drawdown': None,
+            'holdings': {},
+            'correlation': None,
+            'last_updated': datetime.now().isoformat()
+        }
+        if 'volatility' not in metrics:
+            return row
+
+        assets = metrics['assets']
+        holdings = [a for a in assets if a != PORTFOLIO_COLUMN]
+        for j, asset in enumerate(assets):
+            values = {
+                'volatility': num(metrics['volatility'][j]),
+                'beta': num(metrics['beta'][j]),
+                'max_drawdown': num(metrics['max_drawdown'][j])
+            }
+            if asset == PORTFOLIO_COLUMN:
+                row.update(values)
+            else:
+                row['holdings'][asset] = values
+        n = len(holdings)
+        row['correlation'] = {
+            'assets': holdings,
+            'matrix': np.round(metrics['correlation'][:n, :n], 4).tolist()
+        }
+        return row
@@ -0,0 +1,296 @@
+"""
+Price Alert Engine
+Keeps every active alert in per-symbol sorted threshold arrays, so a price
+move from old to new only touches the thresholds between the two instead of
+every alert, and raises debounced notifications in batches
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from price_history import chunks, fetch_all
+
+UP = 1
+DOWN = 2
+DIRECTION_MASKS = {'above': UP, 'below': DOWN, 'both': UP | DOWN}
+# Threshold axes: price alerts compare rupee prices, percent alerts the day's change
+PRICE_AXIS = 0
+PERCENT_AXIS = 1
+NOTIFY_BATCH_SIZE = 500
+
+
+class AlertIndex:
+    """
+    Sorted thresholds per (symbol, axis), built once per load
+
+    Each alert instance (an alert on one symbol; an "any holding" alert
+    expands to one instance per held symbol) contributes one entry per
+    threshold it watches: a price alert at its price, a percent alert at
+    +threshold (above) and/or -threshold (below).
+    """
+
+    def __init__(self, alerts: Sequence[Dict]):
+        """
+        Args:
+            alerts: Alert instances with id, user_id, symbol, alert_type,
+                threshold, direction, cooldown_minutes, trigger_once and
+                last_triggered (epoch seconds, None if never)
+        """
+        n = len(alerts)
+        self.alert_ids = [a['id'] for a in alerts]
+        self.user_ids = [a['user_id'] for a in alerts]
+        self.symbols = [a['symbol'] for a in alerts]
+        self.types = [a['alert_type'] for a in alerts]
+        self.thresholds = np.array([float(a['threshold']) for a in alerts])
+        self.cooldown = np.array([60.0 * int(a.get('cooldown_minutes') or 0) for a in alerts])
+        self.trigger_once = np.array([bool(a.get('trigger_once')) for a in alerts], dtype=bool)
+        self.last_triggered = np.array([-np.inf if a.get('last_triggered') is None else float(a['last_triggered'])
+                                        for a in alerts])
+        self.active = np.ones(n, dtype=bool)
+
+        # Entries: (symbol code, axis, value, direction mask, alert instance)
+        masks = np.array([DIRECTION_MASKS[a.get('direction') or 'both'] for a in alerts], dtype=np.int8)
+        is_percent = np.array([a['alert_type'] == 'percent' for a in alerts], dtype=bool)
+        symbol_names, symbol_codes = np.unique(np.array(self.symbols, dtype=object).astype(str),
+                                               return_inverse=True)
+        positions = np.arange(n)
+
+        price = ~is_percent
+        above = is_percent & (masks & UP).astype(bool)
+        below = is_percent & (masks & DOWN).astype(bool)
+        codes = np.concatenate([symbol_codes[price], symbol_codes[above], symbol_codes[below]])
+        axes = np.concatenate([np.full(price.sum(), PRICE_AXIS), np.full(above.sum() + below.sum(), PERCENT_AXIS)])
+        values = np.concatenate([self.thresholds[price], self.thresholds[above], -self.thresholds[below]])
+        entry_masks = np.concatenate([masks[price], np.full(above.sum(), UP), np.full(below.sum(), DOWN)]).astype(np.int8)
+        owners = np.concatenate([positions[price], positions[above], positions[below]])
+
+        order = np.lexsort((values, axes, codes))
+        self.values = values[order]
+        self.masks = entry_masks[order]
+        self.owners = owners[order]
+        codes, axes = codes[order], axes[order]
+
+        # (symbol, axis) -> (start, end) slice of the sorted entry arrays
+        self.slots: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        if len(order):
+            breaks = np.flatnonzero((np.diff(codes) != 0) | (np.diff(axes) != 0)) + 1
+            starts = np.concatenate([[0], breaks])
+            ends = np.concatenate([breaks, [len(order)]])
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.slots[(str(symbol_names[codes[start]]), int(axes[start]))] = (start, end)
+
+    def __len__(self) -> int:
+        return len(self.alert_ids)
+
+    def watched_symbols(self) -> List[str]:
+        return sorted({symbol for symbol, _ in self.slots})
+
+    def crossed(self, symbol: str, axis: int, old: float, new: float) -> np.ndarray:
+        """
+        Alert instances with a threshold crossed by a move from old to new
+
+        Moving up crosses thresholds with old < t <= new; moving down crosses
+        new <= t < old. Only entries watching that direction count.
+
+        Args:
+            symbol: NSE stock symbol
+            axis: PRICE_AXIS or PERCENT_AXIS
+            old: Previous value
+            new: Current value
+
+        Returns:
+            Array of alert instance positions (may be empty)
+        """
+        slot = self.slots.get((symbol, axis))
+        if slot is None or old == new:
+            return np.empty(0, dtype=np.int64)
+        start, end = slot
+        values = self.values[start:end]
+        if new > old:
+            lo = np.searchsorted(values, old, side='right')
+            hi = np.searchsorted(values, new, side='right')
+            need = UP
+        else:
+            lo = np.searchsorted(values, new, side='left')
+            hi = np.searchsorted(values, old, side='left')
+            need = DOWN
+        if lo == hi:
+            return np.empty(0, dtype=np.int64)
+        hits = self.masks[start + lo:start + hi] & need != 0
+        return self.owners[start + lo:start + hi][hits]
+
+    def fire(self, candidates: np.ndarray, now: float) -> np.ndarray:
+        """
+        Debounce candidates and record the ones that fire
+
+        Args:
+            candidates: Alert instance positions from crossed()
+            now: Current time in epoch seconds
+
+        Returns:
+            Positions that fire now
+        """
+        if not len(candidates):
+            return candidates
+        candidates = np.unique(candidates)
+        ready = self.active[candidates] & (now - self.last_triggered[candidates] >= self.cooldown[candidates])
+        fired = candidates[ready]
+        self.last_triggered[fired] = now
+        self.active[fired] &= ~self.trigger_once[fired]
+        return fired
+
+
+class PriceAlertMonitor:
+    """Evaluates quotes against the alert index and batches notifications"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+        self.index = AlertIndex([])
+        # symbol -> (last price, last day change percent)
+        self.last: Dict[str, Tuple[float, float]] = {}
+        self.pending: List[Dict] = []
+        self.fired_ids: set = set()
+        self.lock = threading.Lock()
+
+    def load(self) -> int:
+        """
+        Load active alerts, expanding "any holding" alerts to the user's held
+        stocks, and seed the previous prices from market_data
+
+        Returns:
+            Number of alert instances indexed
+        """
+        alerts = fetch_all(lambda: self.supabase.table('price_alerts')
+                           .select('id, user_id, symbol, alert_type, threshold, direction, '
+                                   'cooldown_minutes, trigger_once, last_triggered_at')
+                           .eq('is_active', True)
+                           .order('id'))
+
+        holdings: Dict[str, set] = {}
+        if any(a['symbol'] is None for a in alerts):
+            owners = {p['id']: p['user_id'] for p in fetch_all(
+                lambda: self.supabase.table('portfolios').select('id, user_id').order('id'))}
+            for inv in fetch_all(lambda: self.supabase.table('investments')
+                                 .select('portfolio_id, symbol')
+                                 .in_('investment_type', ['stock', 'etf'])
+                                 .not_.is_('symbol', 'null')
+                                 .order('id')):
+                user_id = owners.get(inv['portfolio_id'])
+                if user_id:
+                    holdings.setdefault(user_id, set()).add(inv['symbol'])
+
+        instances = []
+        for alert in alerts:
+            last = alert.get('last_triggered_at')
+            alert['last_triggered'] = datetime.fromisoformat(last).timestamp() if last else None
+            symbols = [alert['symbol']] if alert['symbol'] else sorted(holdings.get(alert['user_id'], ()))
+            instances.extend({**alert, 'symbol': symbol} for symbol in symbols)
+
+        self.index = AlertIndex(instances)
+        self.seed(self.index.watched_symbols())
+        return len(self.index)
+
+    def seed(self, symbols: Sequence[str]) -> None:
+        """Take the previous price of each watched symbol from market_data"""
+        for chunk in chunks(symbols):
+            for row in self.supabase.table('market_data').select(
+                    'symbol, current_price, change_percent').in_('symbol', chunk).execute().data:
+                if row.get('current_price'):
+                    self.last[row['symbol']] = (float(row['current_price']),
+                                                float(row.get('change_percent') or 0))
+
+    def observe(self, quote, now: Optional[float] = None) -> int:
+        """
+        Evaluate one fresh quote against the alerts on its symbol
+
+        Args:
+            quote: Quote record
+            now: Evaluation time in epoch seconds (defaults to now)
+
+        Returns:
+            Number of notifications raised
+        """
+        # A missing price comes through as 0; storing it would make the next
+        # real quote look like a move up from 0 and fire every "above" alert
+        if not quote.current_price:
+            return 0
+        previous = self.last.get(quote.symbol)
+        self.last[quote.symbol] = (quote.current_price, quote.change_percent)
+        if previous is None:
+            return 0
+        old_price, old_change = previous
+        now = time.time() if now is None else now
+
+        candidates = np.concatenate([
+            self.index.crossed(quote.symbol, PRICE_AXIS, old_price, quote.current_price),
+            self.index.crossed(quote.symbol, PERCENT_AXIS, old_change, quote.change_percent),
+        ])
+        fired = self.index.fire(candidates, now)
+        if not len(fired):
+            return 0
+
+        triggered_at = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        notifications = [self._notification(int(i), quote, old_price, triggered_at) for i in fired]
+        with self.lock:
+            self.pending.extend(notifications)
+            self.fired_ids.update(self.index.alert_ids[int(i)] for i in fired)
+        return len(notifications)
+
+    def _notification(self, i: int, quote, old_price: float, triggered_at: str) -> Dict:
+        index = self.index
+        threshold = float(index.thresholds[i])
+        if index.types[i] == 'price':
+            side = 'above' if quote.current_price >= threshold else 'below'
+            message = f"{quote.symbol} crossed {side} ₹{threshold:,.2f} (now ₹{quote.current_price:,.2f})"
+        else:
+            side = 'up' if quote.change_percent > 0 else 'down'
+            message = (f"{quote.symbol} is {side} more than {threshold:g}% today "
+                       f"({quote.change_percent:+.2f}%, now ₹{quote.current_price:,.2f})")
+        return {
+            'alert_id': index.alert_ids[i],
+            'user_id': index.user_ids[i],
+            'symbol': quote.symbol,
+            'price': quote.current_price,
+            'previous_price': old_price,
+            'change_percent': quote.change_percent,
+            'message': message,
+            'triggered_at': triggered_at
+        }
+
+    def flush(self) -> int:
+        """
+        Write pending notifications in batches and mark their alerts triggered
+
+        Returns:
+            Number of notifications written
+        """
+        with self.lock:
+            pending, self.pending = self.pending, []
+            fired_ids, self.fired_ids = self.fired_ids, set()
+        if not pending and not fired_ids:
+            return 0
+        written = 0
+        try:
+            while written < len(pending):
+                batch = pending[written:written + NOTIFY_BATCH_SIZE]
+                self.supabase.table('alert_notifications').insert(batch).execute()
+                written += len(batch)
+            if fired_ids:
+                self.supabase.rpc('mark_alerts_triggered', {
+                    'ids': sorted(fired_ids),
+                    'fired_at': datetime.now(timezone.utc).isoformat()
+                }).execute()
+        except Exception as e:
+            # The index already counts these alerts as fired, so dropping the
+            # batch would lose the notifications for good: queue the unwritten
+            # ones (and every id, the RPC is idempotent) for the next flush
+            with self.lock:
+                self.pending[:0] = pending[written:]
+                self.fired_ids |= fired_ids
+            print(f"❌ Error writing alert notifications ({written}/{len(pending)} written, "
+                  f"rest kept for the next flush): {e}")
+        return written
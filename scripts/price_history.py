@@ -0,0 +1,120 @@
+"""
+Price History Loader
+Loads daily stock closes, mutual fund NAVs and benchmark index closes from
+Supabase into memory, fetching only days newer than the previous load
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from quote import IST
+
+BENCHMARK_INDEX = 'NIFTY 50'
+PAGE_SIZE = 1000
+FILTER_CHUNK = 100
+
+
+def fetch_all(build_query: Callable, page_size: int = PAGE_SIZE) -> List[Dict]:
+    """
+    Page through a PostgREST query (responses are capped at 1000 rows)
+
+    Args:
+        build_query: Returns a fresh query builder for each page
+        page_size: Rows per request
+
+    Returns:
+        Every row of the query
+    """
+    rows: List[Dict] = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+def chunks(values: Sequence[str], size: int = FILTER_CHUNK) -> Iterable[List[str]]:
+    """Split filter values so `in` lists stay within URL length limits"""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def asset_key(investment_type: str, symbol: str) -> str:
+    """History key of a holding: scheme codes get an 'MF:' prefix"""
+    return ('MF:' if investment_type == 'mutual_fund' else '') + symbol
+
+
+class PriceHistory:
+    """Daily price series per asset, kept in memory and extended between runs"""
+
+    def __init__(self, supabase, benchmark: str = BENCHMARK_INDEX):
+        self.supabase = supabase
+        self.benchmark = benchmark
+        self.benchmark_key = f"INDEX:{benchmark}"
+        # asset key -> {date: price}; 'MF:' prefixes scheme codes, 'INDEX:' the benchmark
+        self.series: Dict[str, Dict[date, float]] = {}
+        self.loaded_until: Dict[str, date] = {}
+
+    def load(self, symbols: Sequence[str], scheme_codes: Sequence[str], before: date) -> None:
+        """
+        Load completed days of history, only fetching days newer than already loaded
+
+        Args:
+            symbols: NSE stock symbols
+            scheme_codes: AMFI scheme codes
+            before: First day to exclude (today, whose close is not final yet)
+        """
+        self._load('stock_price_history', 'symbol', 'price_date', 'close', '',
+                   symbols, before)
+        self._load('mutual_fund_nav_history', 'scheme_code', 'nav_date', 'nav', 'MF:',
+                   scheme_codes, before)
+        self._load_benchmark(before)
+
+    def _load(self, table: str, key_column: str, date_column: str, value_column: str,
+              prefix: str, keys: Sequence[str], before: date) -> None:
+        # Group keys by how far they are already loaded, so new holdings get
+        # their full history and known ones only the days since the last run
+        by_since: Dict[Optional[date], List[str]] = defaultdict(list)
+        for key in keys:
+            by_since[self.loaded_until.get(prefix + key)].append(key)
+
+        for since, group in by_since.items():
+            for chunk in chunks(group):
+                def query(chunk=chunk, since=since):
+                    q = (self.supabase.table(table)
+                         .select(f"{key_column}, {date_column}, {value_column}")
+                         .in_(key_column, chunk)
+                         .lt(date_column, before.isoformat())
+                         .order(key_column).order(date_column))
+                    return q.gt(date_column, since.isoformat()) if since else q
+
+                for row in fetch_all(query):
+                    if row[value_column] is None:
+                        continue
+                    self.series.setdefault(prefix + row[key_column], {})[
+                        date.fromisoformat(row[date_column])] = float(row[value_column])
+            for key in group:
+                self.series.setdefault(prefix + key, {})
+                self.loaded_until[prefix + key] = before - timedelta(days=1)
+
+    def _load_benchmark(self, before: date) -> None:
+        since = self.loaded_until.get(self.benchmark_key)
+
+        def query():
+            q = (self.supabase.table('index_data_history')
+                 .select('current_value, as_of')
+                 .eq('index_name', self.benchmark)
+                 .order('as_of'))
+            return q.gte('as_of', since.isoformat()) if since else q
+
+        closes = self.series.setdefault(self.benchmark_key, {})
+        for row in fetch_all(query):
+            day = datetime.fromisoformat(row['as_of']).astimezone(IST).date()
+            if day < before:
+                # Rows are ordered by time, so the last one per day is its close
+                closes[day] = float(row['current_value'])
+        self.loaded_until[self.benchmark_key] = before - timedelta(days=1)
@@ -0,0 +1,229 @@
+"""
+Live Price Push Server
+Keeps the latest quotes in memory and pushes price changes to dashboard
+clients over Server-Sent Events, filtered by each client's symbol set
+
+Clients connect to:
+    GET /prices?symbols=SBIN,TCS   (omit symbols for every stock)
+
+Each client only ever holds the newest pending update per symbol, so a slow
+consumer receives coalesced updates instead of building up a backlog.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+HEARTBEAT_SECONDS = 15
+
+
+@dataclass(eq=False)
+class Subscriber:
+    """One connected SSE client"""
+    symbols: Optional[Set[str]]
+    writer: asyncio.StreamWriter
+    pending: Dict[str, Dict] = field(default_factory=dict)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    sent: int = 0
+    coalesced: int = 0
+
+
+class PriceServer:
+    """asyncio SSE server pushing price deltas to subscribed clients"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765):
+        self.host = host
+        self.port = port
+        self.latest: Dict[str, Dict] = {}
+        self.by_symbol: Dict[str, Set[Subscriber]] = {}
+        self.all_symbols: Set[Subscriber] = set()
+        self.subscribers = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.ready = threading.Event()
+        # Why the server thread stopped, if it did
+        self.error: Optional[BaseException] = None
+
+    # Publishing -----------------------------------------------------------
+
+    def publish(self, symbol: str, price: float, change_percent: float,
+                ts: Optional[float] = None) -> None:
+        """
+        Publish a price from any thread; unchanged prices are dropped
+
+        Args:
+            symbol: NSE stock symbol
+            price: Last traded price
+            change_percent: Change from previous close
+            ts: Quote time in epoch seconds
+        """
+        if self.loop is None:
+            return
+        update = {'symbol': symbol, 'price': price, 'change_percent': change_percent,
+                  'ts': ts if ts is not None else time.time()}
+        self.loop.call_soon_threadsafe(self._apply, update)
+
+    def publish_quote(self, quote) -> None:
+        """Publish a Quote record"""
+        self.publish(quote.symbol, quote.current_price, quote.change_percent, quote.fetched_at)
+
+    def _apply(self, update: Dict) -> None:
+        symbol = update['symbol']
+        previous = self.latest.get(symbol)
+        if previous and previous['price'] == update['price']:
+            return
+        self.latest[symbol] = update
+
+        for subscriber in self.by_symbol.get(symbol, ()):
+            self._queue(subscriber, update)
+        for subscriber in self.all_symbols:
+            self._queue(subscriber, update)
+
+    @staticmethod
+    def _queue(subscriber: Subscriber, update: Dict) -> None:
+        if update['symbol'] in subscriber.pending:
+            subscriber.coalesced += 1
+        subscriber.pending[update['symbol']] = update
+        subscriber.wakeup.set()
+
+    # Connections ----------------------------------------------------------
+
+    def subscriber_count(self) -> int:
+        return self.subscribers
+
+    def _subscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers += 1
+        if subscriber.symbols is None:
+            self.all_symbols.add(subscriber)
+            snapshot = self.latest.values()
+        else:
+            for symbol in subscriber.symbols:
+                self.by_symbol.setdefault(symbol, set()).add(subscriber)
+            snapshot = [self.latest[s] for s in subscriber.symbols if s in self.latest]
+        for update in snapshot:
+            subscriber.pending[update['symbol']] = update
+        if subscriber.pending:
+            subscriber.wakeup.set()
+
+    def _unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers -= 1
+        self.all_symbols.discard(subscriber)
+        for symbol in subscriber.symbols or ():
+            subs = self.by_symbol.get(symbol)
+            if subs is not None:
+                subs.discard(subscriber)
+                if not subs:
+                    del self.by_symbol[symbol]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            url = urlsplit(parts[1]) if len(parts) >= 2 else None
+
+            if url is None or parts[0] != 'GET' or url.path not in ('/prices', '/health'):
+                writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                return
+
+            if url.path == '/health':
+                body = json.dumps({'symbols': len(self.latest),
+                                   'subscribers': self.subscriber_count()}).encode()
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                             b'Access-Control-Allow-Origin: *\r\nConnection: close\r\n'
+                             b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body)
+                await writer.drain()
+                return
+
+            requested = parse_qs(url.query).get('symbols', [''])[0]
+            symbols = {s.strip().upper() for s in requested.split(',') if s.strip()} or None
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                         b'Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n'
+                         b'Connection: keep-alive\r\n\r\n')
+            await writer.drain()
+
+            subscriber = Subscriber(symbols=symbols, writer=writer)
+            self._subscribe(subscriber)
+            try:
+                await self._stream(subscriber)
+            finally:
+                self._unsubscribe(subscriber)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, subscriber: Subscriber) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(subscriber.wakeup.wait(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                subscriber.writer.write(b': ping\n\n')
+                await subscriber.writer.drain()
+                continue
+            subscriber.wakeup.clear()
+            updates, subscriber.pending = subscriber.pending, {}
+            payload = json.dumps(list(updates.values()), separators=(',', ':'))
+            subscriber.writer.write(f"event: prices\ndata: {payload}\n\n".encode())
+            subscriber.sent += len(updates)
+            # While a slow client drains, new prices overwrite its pending dict
+            await subscriber.writer.drain()
+
+    # Lifecycle ------------------------------------------------------------
+
+    async def serve(self) -> None:
+        """Run the server on the current event loop until cancelled"""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                 backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        # Only accept published prices once the socket is bound
+        self.loop = asyncio.get_running_loop()
+        self.ready.set()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.loop = None
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self.serve())
+        except BaseException as e:
+            self.error = e
+            if not self.ready.is_set():
+                print(f"❌ Price server could not start on {self.host}:{self.port}: {e}")
+
+    def start_in_thread(self, timeout: float = 10) -> threading.Thread:
+        """
+        Run the server on its own event loop in a daemon thread
+
+        Args:
+            timeout: Seconds to wait for the server to bind
+
+        Returns:
+            The server thread
+
+        Raises:
+            RuntimeError: The server did not start listening (e.g. the port is in use)
+        """
+        thread = threading.Thread(target=self._run, name='price-server', daemon=True)
+        thread.start()
+        if not self.ready.wait(timeout=timeout) or not thread.is_alive():
+            raise RuntimeError(f"price server did not start on {self.host}:{self.port}: "
+                               f"{self.error or 'timed out'}")
+        return thread
+
+    def seed(self, quotes: Iterable[Dict]) -> None:
+        """Load initial prices (e.g. from market_data) without pushing them"""
+        for row in quotes:
+            if row.get('symbol') and row.get('current_price') is not None:
+                self.latest[row['symbol']] = {
+                    'symbol': row['symbol'], 'price': float(row['current_price']),
+                    'change_percent': float(row.get('change_percent') or 0), 'ts': time.time()
+                }
@@ -0,0 +1,162 @@
+"""
+Quote Records
+Compact typed quote produced by NSEDataFetcher (or the BSE fallback) and
+written to market_data
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+@dataclass(slots=True)
+class Quote:
+    """Live quote for one NSE symbol"""
+    symbol: str
+    company_name: str
+    isin: str
+    current_price: float
+    previous_close: float
+    open: float
+    high: float
+    low: float
+    change: float
+    change_percent: float
+    # None when the source has no volume (BSE); the stored value is then kept
+    volume: Optional[int]
+    # Epoch seconds; formatted only when the row is written
+    fetched_at: float
+    raw_data: Optional[Dict] = None
+    source: str = 'NSE'
+
+    @classmethod
+    def from_nse(cls, symbol: str, data: Dict, fetched_at: Optional[float] = None) -> 'Quote':
+        """
+        Build a quote from an NSE quote-equity payload
+
+        Args:
+            symbol: NSE stock symbol
+            data: Raw quote-equity response
+            fetched_at: Fetch time in epoch seconds (defaults to now)
+
+        Returns:
+            Quote for the symbol
+        """
+        price_info = data.get('priceInfo', {})
+        info = data.get('info', {})
+        pre_open = data.get('preOpenMarket', {})
+        metadata = data.get('metadata', {})
+        high_low = price_info.get('intraDayHighLow', {})
+
+        return cls(
+            symbol=sys.intern(symbol),
+            company_name=info.get('companyName', metadata.get('companyName', '')),
+            isin=info.get('isin', metadata.get('isin', '')),
+            current_price=float(price_info.get('lastPrice', 0)),
+            previous_close=float(price_info.get('previousClose', 0)),
+            open=float(price_info.get('open', 0)),
+            high=float(high_low.get('max', 0)),
+            low=float(high_low.get('min', 0)),
+            change=float(price_info.get('change', 0)),
+            change_percent=float(price_info.get('pChange', 0)),
+            volume=int(pre_open.get('totalTradedVolume', 0)),
+            fetched_at=time.time() if fetched_at is None else fetched_at,
+            raw_data=data,
+        )
+
+    @classmethod
+    def from_bse(cls, symbol: str, data: Dict, company_name: str = '', isin: str = '',
+                 fetched_at: Optional[float] = None) -> 'Quote':
+        """
+        Build a quote from a BSE getScripHeaderData payload
+
+        Args:
+            symbol: NSE stock symbol the quote is stored under
+            data: Raw getScripHeaderData response
+            company_name: Company name (BSE's short names differ from NSE's)
+            isin: ISIN, which the BSE header payload does not carry
+            fetched_at: Fetch time in epoch seconds (defaults to now)
+
+        Returns:
+            Quote for the symbol
+        """
+        header = data.get('Header') or {}
+        current = data.get('CurrRate') or {}
+        names = data.get('Cmpname') or {}
+        last_price = _bse_number(current.get('LTP') or header.get('LTP'))
+        if not last_price:
+            raise ValueError(f"BSE returned no price for {symbol}")
+
+        return cls(
+            symbol=sys.intern(symbol),
+            company_name=company_name or names.get('FullN', ''),
+            isin=isin,
+            current_price=last_price,
+            previous_close=_bse_number(header.get('PrevClose')),
+            open=_bse_number(header.get('Open')),
+            high=_bse_number(header.get('High')),
+            low=_bse_number(header.get('Low')),
+            change=_bse_number(current.get('Chg')),
+            change_percent=_bse_number(current.get('PcChg')),
+            volume=None,
+            fetched_at=time.time() if fetched_at is None else fetched_at,
+            raw_data=data,
+            source='BSE',
+        )
+
+    @property
+    def last_updated(self) -> str:
+        """Fetch time as an ISO timestamp"""
+        return datetime.fromtimestamp(self.fetched_at).isoformat()
+
+    def to_market_data_row(self) -> Dict:
+        """
+        Serialise to a market_data upsert payload
+
+        Returns:
+            Row dictionary keyed by market_data column (no volume if unknown)
+        """
+        row = {
+            'symbol': self.symbol,
+            'isin': self.isin,
+            'company_name': self.company_name,
+            'current_price': self.current_price,
+            'previous_close': self.previous_close,
+            'change_percent': self.change_percent,
+            'volume': self.volume,
+            'last_updated': self.last_updated,
+            'data_source': self.source,
+            'raw_data': self.raw_data
+        }
+        if self.volume is None:
+            del row['volume']
+        return row
+
+    def to_price_history_row(self) -> Dict:
+        """
+        Serialise to a stock_price_history upsert payload (the IST trading day's close so far)
+
+        Returns:
+            Row dictionary keyed by stock_price_history column (no volume if unknown)
+        """
+        row = {
+            'symbol': self.symbol,
+            'price_date': datetime.fromtimestamp(self.fetched_at, IST).date().isoformat(),
+            'close': self.current_price,
+            'volume': self.volume
+        }
+        if self.volume is None:
+            del row['volume']
+        return row
+
+
+def _bse_number(value) -> float:
+    """Convert a BSE number string (comma separated, may be empty) to float"""
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return 0.0
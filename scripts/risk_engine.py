@@ -0,0 +1,275 @@
+"""
+Risk Analytics Engine
+Vectorised volatility, beta, correlation and drawdown over a dense
+date x asset price matrix, with rolling-window state so each new day is
+an incremental update instead of a full recomputation
+"""
+
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TRADING_DAYS = 252
+PORTFOLIO_COLUMN = '__portfolio__'
+
+
+def align_prices(series: Dict[str, Dict[date, float]],
+                 extra_dates: Iterable[date] = ()) -> Tuple[List[date], List[str], np.ndarray]:
+    """
+    Align per-asset price series into a dense date x asset matrix
+
+    Gaps (holidays, missing NAVs) are forward-filled; dates before an asset's
+    first price stay NaN.
+
+    Args:
+        series: Mapping of asset to {date: price}
+        extra_dates: Dates to include as rows even if no asset has a price
+
+    Returns:
+        Tuple of (sorted dates, asset names, float64 matrix of shape (dates, assets))
+    """
+    assets = sorted(series)
+    dates = sorted({d for prices in series.values() for d in prices} | set(extra_dates))
+    row = {d: i for i, d in enumerate(dates)}
+    matrix = np.full((len(dates), len(assets)), np.nan)
+    for j, asset in enumerate(assets):
+        points = series[asset]
+        if points:
+            matrix[[row[d] for d in points], j] = list(points.values())
+    return dates, assets, forward_fill(matrix)
+
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column"""
+    valid = ~np.isnan(matrix)
+    index = np.where(valid, np.arange(matrix.shape[0])[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = matrix[index, np.arange(matrix.shape[1])]
+    # Leading NaNs picked up row 0, which is NaN for assets that start later
+    return filled
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Daily log returns; days without two prices count as a zero return"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(prices), axis=0)
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def window_drawdown(returns: np.ndarray) -> np.ndarray:
+    """
+    Maximum peak-to-trough decline per column over a run of log returns
+
+    Args:
+        returns: (days, assets) daily log returns, oldest first
+
+    Returns:
+        (assets,) drawdowns as negative fractions
+    """
+    # The price path relative to the window's start, including the start itself
+    path = np.vstack([np.zeros((1, returns.shape[1])), np.cumsum(returns, axis=0)])
+    peaks = np.maximum.accumulate(path, axis=0)
+    return np.expm1(path - peaks).min(axis=0)
+
+
+class RollingRiskState:
+    """
+    Running sums over the last `window` daily returns of a set of assets
+
+    push() adds one day and drops the oldest in O(assets^2), so a cached
+    state only needs the days since it was last updated. The state depends
+    only on which assets are held, not on how much of each: the portfolio
+    column is rebuilt from the window's returns whenever metrics are read.
+    """
+
+    def __init__(self, assets: Sequence[str], window: int):
+        n = len(assets)
+        self.assets = list(assets)
+        self.window = window
+        self.returns = np.zeros((window, n))
+        self.bench = np.zeros(window)
+        self.pos = 0
+        self.count = 0
+        self.s_r = np.zeros(n)
+        self.s_rr = np.zeros(n)
+        self.s_rb = np.zeros(n)
+        self.s_cross = np.zeros((n, n))
+        self.s_b = 0.0
+        self.s_bb = 0.0
+        self.last_prices = np.full(n, np.nan)
+        self.last_bench = np.nan
+        self.last_date: Optional[date] = None
+
+    @classmethod
+    def from_history(cls, assets: Sequence[str], window: int, dates: Sequence[date],
+                     prices: np.ndarray, bench: np.ndarray) -> 'RollingRiskState':
+        """
+        Build the state for the latest window from full history in one vectorised pass
+
+        Args:
+            assets: Column names
+            window: Window length in days
+            dates: Row dates
+            prices: (days, assets) aligned prices
+            bench: (days,) aligned benchmark values
+        """
+        state = cls(assets, window)
+        returns = log_returns(prices)
+        bench_returns = log_returns(bench[:, None])[:, 0]
+        recent = returns[-window:]
+        recent_bench = bench_returns[-window:]
+        k = len(recent)
+
+        state.returns[:k] = recent
+        state.bench[:k] = recent_bench
+        state.pos = k % window
+        state.count = k
+        state.s_r = recent.sum(axis=0)
+        state.s_rr = (recent ** 2).sum(axis=0)
+        state.s_rb = recent_bench @ recent
+        state.s_cross = recent.T @ recent
+        state.s_b = float(recent_bench.sum())
+        state.s_bb = float(recent_bench @ recent_bench)
+        if len(prices):
+            state.last_prices = prices[-1].copy()
+            state.last_bench = float(bench[-1])
+            state.last_date = dates[-1]
+        return state
+
+    def push(self, day: date, prices: np.ndarray, bench_value: float) -> None:
+        """
+        Add one day of prices, dropping the oldest return once the window is full
+
+        Args:
+            day: Date of the prices
+            prices: (assets,) prices for the day
+            bench_value: Benchmark value for the day
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = np.nan_to_num(np.log(prices / self.last_prices), nan=0.0, posinf=0.0, neginf=0.0)
+            b = float(np.nan_to_num(np.log(bench_value / self.last_bench), nan=0.0,
+                                    posinf=0.0, neginf=0.0))
+
+        if self.count == self.window:
+            old, old_b = self.returns[self.pos], self.bench[self.pos]
+            self.s_r -= old
+            self.s_rr -= old ** 2
+            self.s_rb -= old * old_b
+            self.s_cross -= np.outer(old, old)
+            self.s_b -= old_b
+            self.s_bb -= old_b ** 2
+        else:
+            self.count += 1
+
+        self.returns[self.pos] = r
+        self.bench[self.pos] = b
+        self.pos = (self.pos + 1) % self.window
+        self.s_r += r
+        self.s_rr += r ** 2
+        self.s_rb += r * b
+        self.s_cross += np.outer(r, r)
+        self.s_b += b
+        self.s_bb += b ** 2
+
+        self.last_prices = np.where(np.isnan(prices), self.last_prices, prices)
+        if not np.isnan(bench_value):
+            self.last_bench = bench_value
+        self.last_date = day
+
+    def window_returns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The window's (days, assets) returns and (days,) benchmark returns, oldest first"""
+        order = (np.arange(self.count) + self.pos - self.count) % self.window
+        return self.returns[order], self.bench[order]
+
+    def metrics(self, weights: Optional[np.ndarray] = None) -> Dict:
+        """
+        Current window metrics
+
+        Args:
+            weights: Current value of each holding; adds a portfolio column
+                built from a constant-weight index of the holdings
+
+        Returns:
+            Dictionary with per-asset volatility, beta and max_drawdown (plus
+            the portfolio column) and the pairwise correlation matrix of the
+            assets
+        """
+        n = self.count
+        assets = list(self.assets)
+        if n < 2:
+            return {'assets': assets, 'days': n}
+        cov = (self.s_cross - np.outer(self.s_r, self.s_r) / n) / (n - 1)
+        var = np.maximum(np.diag(cov), 0)
+        std = np.sqrt(var)
+        bench_var = (self.s_bb - self.s_b ** 2 / n) / (n - 1)
+        bench_cov = (self.s_rb - self.s_r * self.s_b / n) / (n - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+            beta = bench_cov / bench_var if bench_var > 0 else np.full_like(bench_cov, np.nan)
+        np.fill_diagonal(corr, 1.0)
+
+        returns, bench = self.window_returns()
+        drawdown = window_drawdown(returns)
+        if weights is not None and len(assets) and np.sum(weights) > 0:
+            # Daily-rebalanced index of the current holdings over the window
+            weights = np.asarray(weights, dtype=np.float64)
+            p = np.log1p(np.expm1(returns) @ (weights / weights.sum()))
+            p_std = p.std(ddof=1)
+            p_beta = (np.cov(p, bench)[0, 1] / bench_var) if bench_var > 0 else np.nan
+            assets.append(PORTFOLIO_COLUMN)
+            std = np.append(std, p_std)
+            beta = np.append(beta, p_beta)
+            drawdown = np.append(drawdown, window_drawdown(p[:, None]))
+
+        return {
+            'assets': assets,
+            'days': n,
+            'volatility': std * np.sqrt(TRADING_DAYS),
+            'beta': beta,
+            'max_drawdown': drawdown,
+            'correlation': np.nan_to_num(corr, nan=0.0),
+        }
+
+
+class RiskEngine:
+    """Risk metrics per portfolio and window, cached between runs"""
+
+    def __init__(self):
+        self.cache: Dict[Tuple[str, int], RollingRiskState] = {}
+        # States built from full history rather than pushed forward
+        self.rebuilds = 0
+
+    def compute(self, key: str, window: int, dates: List[date], assets: List[str],
+                prices: np.ndarray, bench: np.ndarray,
+                weights: Optional[np.ndarray] = None) -> Dict:
+        """
+        Compute metrics for one portfolio, reusing its cached window state
+
+        The cached state is only rebuilt when the set of held assets changes;
+        new weights (quantities or prices moving) just re-weight the window.
+
+        Args:
+            key: Portfolio (or family) identifier
+            window: Window length in days
+            dates: Row dates of the aligned matrix (completed days only;
+                a day already pushed is never revised)
+            assets: Column names of prices
+            prices: (days, assets) aligned prices for the portfolio's holdings
+            bench: (days,) aligned benchmark values
+            weights: Holding values; adds a portfolio column
+
+        Returns:
+            RollingRiskState.metrics() for the holdings (plus portfolio column)
+        """
+        state = self.cache.get((key, window))
+        if state is None or state.assets != list(assets) or state.last_date is None:
+            state = RollingRiskState.from_history(assets, window, dates, prices, bench)
+            self.rebuilds += 1
+        else:
+            # Only days after the cached state are new
+            for i in range(bisect_right(dates, state.last_date), len(dates)):
+                state.push(dates[i], prices[i], bench[i])
+        self.cache[(key, window)] = state
+        return state.metrics(weights)
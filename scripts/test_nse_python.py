@@ -2,7 +2,7 @@
 Test script to verify nsepython is working
 """
 
-from nsepython import *
+from nsepython import nse_eq
 import json
 from datetime import datetime
 
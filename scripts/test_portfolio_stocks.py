@@ -2,7 +2,7 @@
 Test nsepython with your actual portfolio stocks
 """
 
-from nsepython import *
+from nsepython import nse_eq
 from datetime import datetime
 import time
 
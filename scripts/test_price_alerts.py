@@ -0,0 +1,138 @@
+"""
+Regression tests for price alert evaluation
+Run with `python -m pytest test_price_alerts.py` or `python test_price_alerts.py`
+"""
+
+import price_alerts
+from quote import Quote
+from price_alerts import AlertIndex, PriceAlertMonitor
+
+
+def make_alert(alert_id: str, threshold: float, direction: str = 'above') -> dict:
+    return {
+        'id': alert_id, 'user_id': 'u1', 'symbol': 'SBIN', 'alert_type': 'price',
+        'threshold': threshold, 'direction': direction, 'cooldown_minutes': 0,
+        'trigger_once': False, 'last_triggered': None
+    }
+
+
+def make_quote(price: float, fetched_at: float) -> Quote:
+    return Quote.from_nse('SBIN', {'priceInfo': {'lastPrice': price}}, fetched_at=fetched_at)
+
+
+def make_monitor(thresholds) -> PriceAlertMonitor:
+    monitor = PriceAlertMonitor(supabase=None)
+    monitor.index = AlertIndex([make_alert(str(i), t) for i, t in enumerate(thresholds)])
+    monitor.last['SBIN'] = (900.0, 0.0)
+    return monitor
+
+
+def test_zero_price_quote_is_not_stored_as_previous_price():
+    monitor = make_monitor([100, 500, 850])
+
+    # NSE answered without a lastPrice, which Quote.from_nse turns into 0
+    assert monitor.observe(make_quote(0, 1000), now=1000) == 0
+    assert monitor.last['SBIN'] == (900.0, 0.0)
+
+    # 900 -> 901 crosses none of the thresholds
+    assert monitor.observe(make_quote(901, 1060), now=1060) == 0
+    assert monitor.pending == []
+
+
+def test_real_crossing_still_fires():
+    monitor = make_monitor([100, 500, 850, 950])
+
+    assert monitor.observe(make_quote(0, 1000), now=1000) == 0
+    assert monitor.observe(make_quote(960, 1060), now=1060) == 1
+    assert [n['alert_id'] for n in monitor.pending] == ['3']
+    assert monitor.pending[0]['previous_price'] == 900.0
+
+
+class FlakyClient:
+    """Stand-in Supabase client that fails the first `failures` writes"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.inserted = []
+        self.marked = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        return self._call(lambda: self.inserted.extend(rows))
+
+    def rpc(self, name, params):
+        return self._call(lambda: self.marked.extend(params['ids']))
+
+    def _call(self, write):
+        client = self
+
+        class Call:
+            def execute(self):
+                if client.failures:
+                    client.failures -= 1
+                    raise ConnectionError("network down")
+                write()
+        return Call()
+
+
+def test_failed_flush_keeps_notifications_for_the_next_one():
+    monitor = make_monitor([950])
+    monitor.supabase = FlakyClient(failures=1)
+    assert monitor.observe(make_quote(960, 1000), now=1000) == 1
+
+    assert monitor.flush() == 0
+    assert [n['alert_id'] for n in monitor.pending] == ['0']
+    assert monitor.fired_ids == {'0'}
+
+    assert monitor.flush() == 1
+    assert [n['alert_id'] for n in monitor.supabase.inserted] == ['0']
+    assert monitor.supabase.marked == ['0']
+    assert monitor.pending == [] and monitor.fired_ids == set()
+
+
+def test_partial_flush_does_not_resend_written_batches():
+    monitor = make_monitor([910, 920, 930])
+    monitor.supabase = client = FlakyClient()
+    assert monitor.observe(make_quote(940, 1000), now=1000) == 3
+
+    batch_size = price_alerts.NOTIFY_BATCH_SIZE
+    price_alerts.NOTIFY_BATCH_SIZE = 2
+    try:
+        # First batch lands, the second fails
+        original = client.insert
+        client.insert = lambda rows: (original(rows) if len(client.inserted) < 2
+                                      else FlakyClient(failures=1).insert(rows))
+        assert monitor.flush() == 2
+        assert [n['alert_id'] for n in monitor.pending] == ['2']
+
+        client.insert = original
+        assert monitor.flush() == 1
+    finally:
+        price_alerts.NOTIFY_BATCH_SIZE = batch_size
+    assert [n['alert_id'] for n in client.inserted] == ['0', '1', '2']
+    assert sorted(client.marked) == ['0', '1', '2']
+
+
+def test_failed_mark_is_retried_without_resending_notifications():
+    monitor = make_monitor([950])
+    monitor.supabase = client = FlakyClient()
+    assert monitor.observe(make_quote(960, 1000), now=1000) == 1
+
+    client.rpc, rpc = FlakyClient(failures=1).rpc, client.rpc
+    assert monitor.flush() == 1
+    assert monitor.pending == [] and monitor.fired_ids == {'0'}
+
+    client.rpc = rpc
+    assert monitor.flush() == 0
+    assert len(client.inserted) == 1 and client.marked == ['0']
+
+
+if __name__ == "__main__":
+    test_zero_price_quote_is_not_stored_as_previous_price()
+    test_real_crossing_still_fires()
+    test_failed_flush_keeps_notifications_for_the_next_one()
+    test_partial_flush_does_not_resend_written_batches()
+    test_failed_mark_is_retried_without_resending_notifications()
+    print("✅ Price alert regression tests passed")
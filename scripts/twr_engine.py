@@ -0,0 +1,146 @@
+"""
+Time-Weighted Return Engine
+Splits each portfolio's history at its transaction cashflows and chains the
+sub-period returns, for every portfolio at once, as dense NumPy arrays
+"""
+
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from risk_engine import forward_fill
+
+# transaction_type -> (quantity sign, cashflow sign). Cashflows are money put
+# into the portfolio; a dividend is paid out, so it is a withdrawal.
+TRANSACTION_EFFECTS = {
+    'buy': (1, 1),
+    'sell': (-1, -1),
+    'bonus': (1, 0),
+    'dividend': (0, -1),
+}
+
+
+def build_positions(dates: Sequence[date], investment_ids: Sequence[str],
+                    transactions: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn transactions into daily holdings and cashflows per investment
+
+    Args:
+        dates: Sorted row dates; every transaction date must be one of them
+        investment_ids: Column order
+        transactions: transactions rows (investment_id, transaction_type,
+            quantity, price, total_amount, transaction_date)
+
+    Returns:
+        Tuple of (days, investments) arrays: quantity held at each day's
+        close, net cashflow on each day, and the last transaction price
+        (forward-filled, NaN before the first transaction)
+    """
+    column = {inv: j for j, inv in enumerate(investment_ids)}
+    day = {d: i for i, d in enumerate(dates)}
+    shape = (len(dates), len(investment_ids))
+
+    rows, cols, quantities, amounts, prices = [], [], [], [], []
+    for txn in transactions:
+        effect = TRANSACTION_EFFECTS.get((txn.get('transaction_type') or '').lower())
+        j = column.get(txn.get('investment_id'))
+        if effect is None or j is None:
+            continue
+        quantity = float(txn.get('quantity') or 0)
+        price = float(txn.get('price') or 0)
+        amount = txn.get('total_amount')
+        amount = float(amount) if amount is not None else quantity * price
+        rows.append(day[date.fromisoformat(str(txn['transaction_date']))])
+        cols.append(j)
+        quantities.append(effect[0] * quantity)
+        amounts.append(effect[1] * amount)
+        prices.append(price if price > 0 and effect[0] else np.nan)
+
+    rows, cols = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+    quantity = np.zeros(shape)
+    flows = np.zeros(shape)
+    np.add.at(quantity, (rows, cols), quantities)
+    np.add.at(flows, (rows, cols), amounts)
+    np.cumsum(quantity, axis=0, out=quantity)
+    # Sells can leave float dust; anything this small is a closed position
+    quantity[np.abs(quantity) < 1e-9] = 0.0
+
+    trade_price = np.full(shape, np.nan)
+    trade_price[rows, cols] = prices
+    return quantity, flows, forward_fill(trade_price)
+
+
+def time_weighted_returns(values: np.ndarray, flows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Chain daily sub-period returns for many portfolios at once
+
+    Each day is a sub-period ending at the close, with that day's cashflows
+    treated as happening at the close: r = (V_t - F_t) / V_{t-1} - 1. On a day
+    that starts from nothing, the money put in is the starting value:
+    r = V_t / F_t - 1. Days with nothing held have a zero return.
+
+    Args:
+        values: (days, portfolios) market value at each close
+        flows: (days, portfolios) net cashflow into each portfolio per day
+
+    Returns:
+        Tuple of (daily returns, cumulative time-weighted return), both
+        (days, portfolios)
+    """
+    previous = np.vstack([np.zeros((1, values.shape[1])), values[:-1]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(previous > 0, (values - flows) / previous - 1,
+                         np.where(flows > 0, values / flows - 1, 0.0))
+    daily = np.nan_to_num(daily, nan=0.0, posinf=0.0, neginf=0.0)
+    return daily, np.cumprod(1 + daily, axis=0) - 1
+
+
+def benchmark_returns(bench: np.ndarray, active: np.ndarray, twr: np.ndarray) -> np.ndarray:
+    """
+    Benchmark return since each portfolio's first invested day
+
+    Benchmark history can start after a portfolio does, so the benchmark is
+    rebased on the first day both have values and chained onto the
+    portfolio's own return up to that day. twr minus the result is then the
+    excess return over the period the two can actually be compared.
+
+    Args:
+        bench: (days,) benchmark closes, forward-filled
+        active: (days, portfolios) True where the portfolio holds anything
+        twr: (days, portfolios) cumulative time-weighted returns
+
+    Returns:
+        (days, portfolios) cumulative benchmark return, NaN before the
+        portfolio and the benchmark both have values
+    """
+    days = np.arange(len(bench))
+    # Every day from the first active one on counts, even if the portfolio later empties
+    started = np.maximum.accumulate(active, axis=0)
+    common = started & ~np.isnan(bench)[:, None]
+    first = np.where(common.any(axis=0), common.argmax(axis=0), len(bench))
+    base = np.minimum(first, len(bench) - 1)
+    columns = np.arange(active.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = (1 + twr[base, columns])[None, :] * (bench[:, None] / bench[base][None, :]) - 1
+    out[days[:, None] < first[None, :]] = np.nan
+    return out
+
+
+def scope_matrix(memberships: Sequence[Sequence[str]], scopes: List[str]) -> np.ndarray:
+    """
+    0/1 matrix mapping investments to the scopes that contain them
+
+    Args:
+        memberships: Scopes containing each investment column (e.g. its
+            portfolio and its owner's family)
+        scopes: Scope order
+
+    Returns:
+        (investments, scopes) float matrix; values @ matrix sums per scope
+    """
+    index = {scope: k for k, scope in enumerate(scopes)}
+    matrix = np.zeros((len(memberships), len(scopes)))
+    for i, member_of in enumerate(memberships):
+        matrix[i, [index[scope] for scope in member_of]] = 1.0
+    return matrix
@@ -7,16 +7,15 @@ Runs automatically every hour from 9 AM to 4 PM IST on trading days
 import os
 import sys
 import time
-import schedule
-import pytz
-from datetime import datetime, time as dt_time
-from typing import List, Dict
-from supabase import create_client, Client
+from datetime import date, datetime, time as dt_time
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
 
 # Import our fetchers
 from nse_fetcher import NSEDataFetcher
 from mutual_fund_fetcher import MutualFundFetcher
+from pipeline import StreamingPipeline
+from http_pool import ConnectionStats, NSESession, create_pooled_session, create_postgrest_client, session_stats
 
 # Load environment variables from scripts/.env
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,80 +25,360 @@ load_dotenv(dotenv_path=env_path)
 class SupabaseUpdater:
     """Update market data in Supabase"""
 
-    def __init__(self):
+    def __init__(self, hedge: bool = False, copy_dsn: Optional[str] = None):
+        """
+        Args:
+            hedge: Hedge slow NSE quote requests with BSE (for symbols with a
+                BSE code in stock_metadata)
+            copy_dsn: Postgres connection string; when set, market data and
+                NAV history are bulk-written with COPY instead of PostgREST
+        """
         supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
         supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
         if not supabase_url or not supabase_key:
             raise ValueError("Supabase credentials not found in environment variables")
 
-        self.supabase: Client = create_client(supabase_url, supabase_key)
-        self.nse_fetcher = NSEDataFetcher()
-        self.mf_fetcher = MutualFundFetcher()
+        from supabase import create_client, ClientOptions
+
+        # Keep-alive pools live as long as the updater, so a scheduler that
+        # reuses one updater skips TCP/TLS setup on every run after the first
+        self.postgrest_http, self.postgrest_counter = create_postgrest_client()
+        self.supabase = create_client(
+            supabase_url, supabase_key,
+            options=ClientOptions(httpx_client=self.postgrest_http)
+        )
+        self.nse_session = NSESession()
+        self.mf_session = create_pooled_session()
+        self.hedged_fetcher = self.create_hedged_fetcher() if hedge else None
+        self.nse_fetcher = NSEDataFetcher(session=self.nse_session, hedged=self.hedged_fetcher)
+        self.mf_fetcher = MutualFundFetcher(session=self.mf_session)
+        self.copy_writer = self.create_copy_writer(copy_dsn) if copy_dsn else None
+        # COPY has no per-request overhead to amortise, so fewer, larger merges win
+        self.write_batch_size = 500 if self.copy_writer else 50
+        # Callables given each fresh Quote (e.g. the live price push server)
+        self.quote_listeners: List[Callable] = []
+        # Created on first use; keep loaded history and analytics state between runs
+        self.price_history = None
+        self.risk_updater = None
+        self.returns_updater = None
+        self.alert_monitor = None
+
+    def publish_quote(self, quote) -> None:
+        """Hand a fresh quote to every registered listener"""
+        for listener in self.quote_listeners:
+            try:
+                listener(quote)
+            except Exception as e:
+                print(f"Error publishing {quote.symbol}: {e}")
+
+    def connection_stats(self) -> Dict[str, ConnectionStats]:
+        """
+        Get connection reuse counters for each pooled client
+
+        Returns:
+            Dictionary mapping client name to its ConnectionStats
+        """
+        return {
+            'NSE': self.nse_session.stats(),
+            'mfapi': session_stats(self.mf_session),
+            'PostgREST': self.postgrest_counter.stats,
+        }
+
+    def print_connection_stats(self) -> None:
+        """Print connection reuse counters for each pooled client"""
+        print("🔌 Connection pools:")
+        for name, stats in self.connection_stats().items():
+            print(f"   {name:10} | {stats}")
+        print(f"   NSE cookie refreshes: {self.nse_session.cookie_refreshes}")
+        if self.hedged_fetcher is not None:
+            print(f"   Hedging: {self.hedged_fetcher.stats}")
+            print(f"   Hedge deadline: {self.hedged_fetcher.tracker.deadline() * 1000:.0f} ms")
+
+    def create_hedged_fetcher(self):
+        """
+        Build the NSE-first, BSE-hedged quote fetcher from stock_metadata BSE codes
+
+        Returns:
+            HedgedQuoteFetcher
+        """
+        from hedged_fetch import BSEQuoteSource, HedgedQuoteFetcher, NSEQuoteSource
+        from price_history import chunks, fetch_all
+
+        instruments = {}
+        try:
+            for row in fetch_all(lambda: self.supabase.table('stock_metadata')
+                                 .select('symbol, company_name, bse_code')
+                                 .not_.is_('bse_code', 'null').order('symbol')):
+                instruments[row['symbol']] = dict(row)
+            for chunk in chunks(sorted(instruments)):
+                for row in self.supabase.table('market_data').select(
+                        'symbol, isin').in_('symbol', chunk).execute().data:
+                    instruments[row['symbol']]['isin'] = row.get('isin')
+        except Exception as e:
+            print(f"⚠️  BSE codes unavailable, NSE quotes will not be hedged: {e}")
+        print(f"🛡️  Hedging NSE quotes with BSE for {len(instruments)} symbols")
+        return HedgedQuoteFetcher(NSEQuoteSource(), BSEQuoteSource(instruments))
+
+    def create_copy_writer(self, dsn: str):
+        """
+        Connect the COPY write backend
+
+        Args:
+            dsn: Postgres connection string
+
+        Returns:
+            CopyWriter, or None to keep writing through PostgREST
+        """
+        from copy_writer import create_copy_writer
+
+        try:
+            writer = create_copy_writer(dsn)
+        except Exception as e:
+            print(f"⚠️  COPY backend unavailable, writing through PostgREST: {e}")
+            return None
+        print("🚚 Bulk writes: Postgres COPY")
+        return writer
 
-    def update_stock_data(self, symbols: List[str]) -> None:
+    def copy_upsert(self, table: str, rows: List[Dict], ignore_duplicates: bool = False) -> bool:
+        """
+        Upsert rows through the COPY backend if it is enabled
+
+        Args:
+            table: Target table
+            rows: Rows as built for the PostgREST upsert
+            ignore_duplicates: Keep existing rows instead of updating them
+
+        Returns:
+            True if the rows were written, False if the caller should use PostgREST
+        """
+        if self.copy_writer is None:
+            return False
+        try:
+            self.copy_writer.upsert(table, rows, ignore_duplicates=ignore_duplicates)
+            return True
+        except Exception as e:
+            print(f"⚠️  COPY into {table} failed, retrying through PostgREST: {str(e)[:80]}")
+            return False
+
+    def update_stock_data(self, symbols: List[str], movers=None) -> None:
         """
         Update stock data for given symbols
 
         Args:
             symbols: List of NSE stock symbols to update
+            movers: Optional MoversTracker fed every fresh quote
         """
         print(f"\n{'='*60}")
         print(f"📊 Updating data for {len(symbols)} stocks...")
         print(f"{'='*60}\n")
 
-        quotes = self.nse_fetcher.get_multiple_quotes(symbols)
+        counts = {'updated': 0, 'failed': 0, 'skipped': 0, 'alerts': 0}
+        alerts = self.load_price_alerts()
 
-        updated_count = 0
-        failed_count = 0
-        skipped_count = 0
+        def to_row(item):
+            symbol, quote = item
+            if not quote:
+                print(f"⚠️  {symbol:12} | No data returned")
+                counts['skipped'] += 1
+                return None
+            self.publish_quote(quote)
+            if movers is not None:
+                movers.add(quote)
+            if alerts is not None:
+                alerts.observe(quote)
+            return quote.to_market_data_row(), quote.to_price_history_row()
+
+        def write_group(items):
+            rows = [row for row, _ in items]
+            if self.copy_upsert('market_data', rows):
+                written = rows
+            else:
+                written = self.upsert_market_data(rows, counts)
 
-        for symbol, data in quotes.items():
-            if data:
+            written_symbols = {row['symbol'] for row in written}
+            history = [h for _, h in items if h['symbol'] in written_symbols]
+            if history and not self.copy_upsert('stock_price_history', history):
                 try:
-                    # Upsert into market_data table
-                    self.supabase.table('market_data').upsert({
-                        'symbol': data['symbol'],
-                        'isin': data.get('isin'),
-                        'company_name': data.get('company_name'),
-                        'current_price': data.get('current_price'),
-                        'previous_close': data.get('previous_close'),
-                        'change_percent': data.get('change_percent'),
-                        'volume': data.get('volume'),
-                        'last_updated': datetime.now().isoformat(),
-                        'data_source': 'NSE',
-                        'raw_data': data.get('raw_data')
-                    }, on_conflict='symbol').execute()
-
-                    price = data.get('current_price', 0)
-                    change = data.get('change_percent', 0)
-                    company = data.get('company_name', symbol)
-                    print(f"✅ {symbol:12} | ₹{price:10.2f} | {change:+7.2f}% | {company[:30]}")
-                    updated_count += 1
+                    self.supabase.table('stock_price_history').upsert(
+                        history, on_conflict='symbol,price_date'
+                    ).execute()
                 except Exception as e:
-                    print(f"❌ {symbol:12} | Error: {str(e)[:50]}")
-                    failed_count += 1
-            else:
-                print(f"⚠️  {symbol:12} | No data returned")
-                skipped_count += 1
+                    print(f"❌ Error writing daily price history: {str(e)[:50]}")
+            return written
+
+        def write_rows(items):
+            # BSE rows leave volume out so the stored NSE volume is kept; a
+            # bulk upsert fills missing columns, so each column set goes alone
+            groups: Dict[tuple, list] = {}
+            for item in items:
+                groups.setdefault(tuple(item[0]), []).append(item)
+            written = [row for group in groups.values() for row in write_group(group)]
+
+            for row in written:
+                price = row.get('current_price') or 0
+                change = row.get('change_percent') or 0
+                company = row.get('company_name') or row['symbol']
+                print(f"✅ {row['symbol']:12} | ₹{price:10.2f} | {change:+7.2f}% | {company[:30]}")
+            counts['updated'] += len(written)
+            if alerts is not None:
+                counts['alerts'] += alerts.flush()
+
+        # Quotes stream into batched upserts while fetching continues; the
+        # bounded queues keep memory flat regardless of universe size
+        pipeline = StreamingPipeline(to_row, write_rows, batch_size=self.write_batch_size)
+        pipeline.run(self.nse_fetcher.iter_quotes(symbols))
+        if alerts is not None:
+            counts['alerts'] += alerts.flush()
+
+        updated_count = counts['updated']
+        failed_count = counts['failed']
+        skipped_count = counts['skipped']
 
         print(f"\n{'='*60}")
         print(f"📈 Update Summary:")
         print(f"   ✅ Successfully updated: {updated_count}")
         print(f"   ❌ Failed: {failed_count}")
         print(f"   ⚠️  Skipped (no data): {skipped_count}")
+        if alerts is not None:
+            print(f"   🔔 Alert notifications: {counts['alerts']}")
         print(f"   📊 Total processed: {len(symbols)}")
         print(f"{'='*60}\n")
 
-    def update_mutual_fund_data(self, scheme_codes: List[str]) -> None:
+    def upsert_market_data(self, rows: List[Dict], counts: Dict[str, int]) -> List[Dict]:
+        """
+        Upsert market_data rows through PostgREST
+
+        Args:
+            rows: market_data rows
+            counts: Update counters; 'failed' is incremented per rejected row
+
+        Returns:
+            Rows that were written
+        """
+        try:
+            self.supabase.table('market_data').upsert(rows, on_conflict='symbol').execute()
+            return rows
+        except Exception:
+            # Retry row by row so one bad row doesn't fail the whole batch
+            written = []
+            for row in rows:
+                try:
+                    self.supabase.table('market_data').upsert(row, on_conflict='symbol').execute()
+                    written.append(row)
+                except Exception as e:
+                    print(f"❌ {row['symbol']:12} | Error: {str(e)[:50]}")
+                    counts['failed'] += 1
+            return written
+
+    def load_price_alerts(self):
+        """
+        Reload active price alerts for an update cycle
+
+        Returns:
+            PriceAlertMonitor, or None if there are no alerts or they cannot be loaded
+        """
+        try:
+            if self.alert_monitor is None:
+                from price_alerts import PriceAlertMonitor
+                self.alert_monitor = PriceAlertMonitor(self.supabase)
+            count = self.alert_monitor.load()
+        except Exception as e:
+            print(f"⚠️  Price alerts unavailable: {e}")
+            return None
+        if not count:
+            return None
+        print(f"🔔 Watching {count} price alerts")
+        return self.alert_monitor
+
+    def update_index_data(self) -> None:
+        """Snapshot every NSE index into index_data and append it to index_data_history"""
+        rows = self.nse_fetcher.get_all_indices()
+        if not rows:
+            print("⚠️  No index data returned")
+            return
+
+        history = [{
+            'index_name': row['index_name'],
+            'current_value': row['current_value'],
+            'previous_close': row['previous_close'],
+            'open': row['open'],
+            'high': row['high'],
+            'low': row['low'],
+            'change_percent': row['change_percent'],
+            'as_of': row['as_of']
+        } for row in rows]
+        now = datetime.now().isoformat()
+        for row in rows:
+            row['last_updated'] = now
+
+        try:
+            self.supabase.table('index_data').upsert(rows, on_conflict='index_name').execute()
+            # Same NSE snapshot seen twice (e.g. after market close) is skipped
+            self.supabase.table('index_data_history').upsert(
+                history, on_conflict='index_name,as_of', ignore_duplicates=True
+            ).execute()
+            print(f"📈 Updated {len(rows)} indices (as of {rows[0]['as_of']})")
+        except Exception as e:
+            print(f"❌ Error updating index data: {e}")
+
+    def get_price_history(self):
+        """Daily price history shared by the risk and return analytics"""
+        if self.price_history is None:
+            from price_history import PriceHistory
+            self.price_history = PriceHistory(self.supabase)
+        return self.price_history
+
+    def update_rollups(self) -> None:
+        """Run the once-per-cycle portfolio rollups: exposure, risk metrics and returns"""
+        self.update_exposure()
+        self.update_risk_metrics()
+        self.update_portfolio_returns()
+
+    def update_exposure(self) -> None:
+        """Rebuild sector, industry and market cap exposure for every user, member and portfolio"""
+        try:
+            from exposure_rollup import ExposureRollup
+            written = ExposureRollup(self.supabase).update()
+            print(f"🥧 Updated {written} exposure rollups")
+        except Exception as e:
+            print(f"❌ Error updating exposure: {e}")
+
+    def update_risk_metrics(self) -> None:
+        """Recompute volatility, beta, correlation and drawdown for every portfolio and family"""
+        try:
+            if self.risk_updater is None:
+                from portfolio_risk import PortfolioRiskUpdater
+                self.risk_updater = PortfolioRiskUpdater(self.supabase, history=self.get_price_history())
+            written = self.risk_updater.update()
+            print(f"📐 Updated {written} portfolio risk metric rows")
+        except Exception as e:
+            print(f"❌ Error updating risk metrics: {e}")
+
+    def update_portfolio_returns(self) -> None:
+        """Extend the daily time-weighted return series of every portfolio and family"""
+        try:
+            if self.returns_updater is None:
+                from portfolio_returns import PortfolioReturnsUpdater
+                self.returns_updater = PortfolioReturnsUpdater(self.supabase, history=self.get_price_history())
+            written = self.returns_updater.update()
+            print(f"📈 Stored {written} daily portfolio return rows")
+        except Exception as e:
+            print(f"❌ Error updating portfolio returns: {e}")
+
+    def update_mutual_fund_data(self, scheme_codes: List[str], backfill: bool = False) -> None:
         """
-        Update mutual fund NAV data
+        Update mutual fund NAV data and append new NAVs to mutual_fund_nav_history
 
         Args:
             scheme_codes: List of AMFI scheme codes
+            backfill: Write each scheme's full NAV history instead of only
+                dates after the stored high-water mark
         """
         print(f"Updating data for {len(scheme_codes)} mutual funds...")
 
+        high_water_marks = {} if backfill else self.get_nav_high_water_marks(scheme_codes)
+
         for code in scheme_codes:
             data = self.mf_fetcher.get_scheme_details(code)
 
@@ -116,10 +395,51 @@ class SupabaseUpdater:
                         'raw_data': data.get('raw_data')
                     }, on_conflict='scheme_code').execute()
 
-                    print(f"✓ Updated {data['scheme_name']}")
+                    new_navs = list(self.mf_fetcher.iter_nav_history(
+                        code, data['nav_history'], after=high_water_marks.get(code)
+                    ))
+                    self.append_nav_history(new_navs)
+
+                    print(f"✓ Updated {data['scheme_name']} (+{len(new_navs)} NAVs)")
                 except Exception as e:
                     print(f"✗ Error updating {code}: {e}")
 
+    def get_nav_high_water_marks(self, scheme_codes: List[str]) -> Dict[str, date]:
+        """
+        Get the latest NAV date stored in mutual_fund_nav_history per scheme
+
+        Args:
+            scheme_codes: List of AMFI scheme codes
+
+        Returns:
+            Dictionary mapping scheme code to its last stored NAV date
+        """
+        try:
+            response = self.supabase.rpc('get_nav_high_water_marks', {'codes': scheme_codes}).execute()
+            return {
+                row['scheme_code']: date.fromisoformat(row['last_nav_date'])
+                for row in response.data if row.get('last_nav_date')
+            }
+        except Exception as e:
+            # Without high-water marks every NAV is re-sent; duplicates are ignored
+            print(f"Error fetching NAV high-water marks: {e}")
+            return {}
+
+    def append_nav_history(self, rows: List[Dict], batch_size: int = 1000) -> None:
+        """
+        Insert NAV history rows in batches, skipping dates already stored
+
+        Args:
+            rows: mutual_fund_nav_history rows
+            batch_size: Rows per insert request
+        """
+        if self.copy_upsert('mutual_fund_nav_history', rows, ignore_duplicates=True):
+            return
+        for i in range(0, len(rows), batch_size):
+            self.supabase.table('mutual_fund_nav_history').upsert(
+                rows[i:i + batch_size], on_conflict='scheme_code,nav_date', ignore_duplicates=True
+            ).execute()
+
     def get_active_symbols_from_portfolio(self) -> List[str]:
         """
         Get list of stock symbols that users have in their portfolios
@@ -142,6 +462,28 @@ class SupabaseUpdater:
             print(f"Error fetching active symbols: {e}")
             return []
 
+    def get_active_scheme_codes_from_portfolio(self) -> List[str]:
+        """
+        Get list of mutual fund scheme codes that users have in their portfolios
+
+        Returns:
+            List of unique AMFI scheme codes
+        """
+        try:
+            response = self.supabase.table('investments').select('symbol').eq(
+                'investment_type', 'mutual_fund'
+            ).execute()
+
+            codes = set()
+            for row in response.data:
+                if row.get('symbol'):
+                    codes.add(row['symbol'])
+
+            return list(codes)
+        except Exception as e:
+            print(f"Error fetching active scheme codes: {e}")
+            return []
+
     def get_all_symbols_from_metadata(self) -> List[str]:
         """
         Get list of ALL stock symbols from stock_metadata table
@@ -183,19 +525,65 @@ class SupabaseUpdater:
         else:
             print("No stocks found in portfolios")
 
+    def get_sector_map(self) -> Dict[str, str]:
+        """
+        Get the sector of every stock in stock_metadata
+
+        Returns:
+            Dictionary mapping symbol to sector
+        """
+        from price_history import fetch_all
+
+        try:
+            rows = fetch_all(lambda: self.supabase.table('stock_metadata')
+                             .select('symbol, sector').not_.is_('sector', 'null').order('symbol'))
+            return {row['symbol']: row['sector'] for row in rows}
+        except Exception as e:
+            print(f"Error fetching sectors: {e}")
+            return {}
+
+    def publish_movers(self, movers) -> None:
+        """
+        Replace market_movers with the gainers and losers of a full update cycle
+
+        Args:
+            movers: MoversTracker fed during the cycle
+        """
+        rows = movers.rows()
+        if not rows:
+            print("⚠️  No movers to publish")
+            return
+        try:
+            self.supabase.table('market_movers').upsert(rows, on_conflict='sector,direction').execute()
+            # Lists not refreshed this cycle (a sector with no gainers today) are stale
+            self.supabase.table('market_movers').delete().lt('as_of', rows[0]['as_of']).execute()
+            print(f"🏁 Published top {movers.k} movers for {len(rows)} lists from {movers.seen} quotes")
+        except Exception as e:
+            print(f"❌ Error publishing market movers: {e}")
+
     def update_all_stocks(self) -> None:
-        """Update market data for ALL stocks in the database"""
+        """Update market data for ALL stocks in the database and publish the day's movers"""
+        from market_movers import MoversTracker
+
         symbols = self.get_all_symbols_from_metadata()
         if symbols:
             print(f"Updating ALL {len(symbols)} stocks from database")
-            self.update_stock_data(symbols)
+            movers = MoversTracker(self.get_sector_map())
+            self.update_stock_data(symbols, movers=movers)
+            self.publish_movers(movers)
         else:
             print("No stocks found in database")
 
 
+def get_ist():
+    """Get the India Standard Time zone (pytz is only imported when needed)"""
+    import pytz
+    return pytz.timezone('Asia/Kolkata')
+
+
 def is_trading_day() -> bool:
     """Check if today is a trading day (Monday-Friday)"""
-    ist = pytz.timezone('Asia/Kolkata')
+    ist = get_ist()
     now = datetime.now(ist)
     # Monday = 0, Sunday = 6
     return now.weekday() < 5  # Monday to Friday
@@ -203,7 +591,7 @@ def is_trading_day() -> bool:
 
 def is_trading_hours() -> bool:
     """Check if current time is within trading hours (9 AM - 4 PM IST)"""
-    ist = pytz.timezone('Asia/Kolkata')
+    ist = get_ist()
     now = datetime.now(ist)
     current_time = now.time()
 
@@ -214,9 +602,14 @@ def is_trading_hours() -> bool:
     return market_open <= current_time <= market_close
 
 
-def update_job():
-    """Job function that runs every hour during trading hours"""
-    ist = pytz.timezone('Asia/Kolkata')
+def update_job(updater: Optional[SupabaseUpdater] = None):
+    """
+    Job function that runs every hour during trading hours
+
+    Args:
+        updater: Long-lived updater to reuse; a new one is created if omitted
+    """
+    ist = get_ist()
     now = datetime.now(ist)
     timestamp = now.strftime("%Y-%m-%d %H:%M:%S IST")
 
@@ -234,20 +627,36 @@ def update_job():
         return
 
     try:
-        updater = SupabaseUpdater()
-        print("✅ Connected to Supabase successfully")
+        if updater is None:
+            updater = SupabaseUpdater()
+            print("✅ Connected to Supabase successfully")
         print(f"📊 Updating ALL stocks from database...")
         updater.update_all_stocks()
+        updater.update_index_data()
+        updater.update_rollups()
         print(f"✓ Update completed successfully at {timestamp}!")
+        updater.print_connection_stats()
     except Exception as e:
         print(f"❌ Error during update: {str(e)}")
         import traceback
         traceback.print_exc()
 
 
-def run_scheduler():
-    """Run the scheduler that updates data every hour from 9 AM to 4 PM IST"""
-    ist = pytz.timezone('Asia/Kolkata')
+def run_scheduler(intraday_seconds: Optional[int] = None, push_port: Optional[int] = None,
+                  hedge: bool = False, copy_dsn: Optional[str] = None):
+    """
+    Run the scheduler that updates data every hour from 9 AM to 4 PM IST
+
+    Args:
+        intraday_seconds: If set, also poll held symbols this often and
+            build 1-minute/5-minute bars on a background thread
+        push_port: If set, serve live price changes over SSE on this port
+        hedge: Hedge slow NSE quote requests with BSE
+        copy_dsn: Postgres connection string for COPY bulk writes
+    """
+    import schedule
+
+    ist = get_ist()
 
     print("\n" + "="*60)
     print("🚀 NSE Market Data Auto-Updater Started")
@@ -259,13 +668,42 @@ def run_scheduler():
     print("="*60)
     print("\n💡 Press Ctrl+C to stop the scheduler\n")
 
+    # One updater for the life of the daemon keeps HTTP pools and NSE cookies warm
+    updater = SupabaseUpdater(hedge=hedge, copy_dsn=copy_dsn)
+    print("✅ Connected to Supabase successfully")
+
+    if push_port:
+        from price_server import PriceServer
+        price_server = PriceServer(port=push_port)
+        from price_history import fetch_all
+        try:
+            # Page through the table; one request returns at most 1000 rows
+            price_server.seed(fetch_all(lambda: updater.supabase.table('market_data').select(
+                'symbol, current_price, change_percent').order('symbol')))
+        except Exception as e:
+            print(f"⚠️  Could not seed live prices from market_data: {e}")
+        try:
+            price_server.start_in_thread()
+        except RuntimeError as e:
+            print(f"⚠️  Live prices disabled: {e}")
+        else:
+            updater.quote_listeners.append(price_server.publish_quote)
+            print(f"📡 Live prices: http://{price_server.host}:{price_server.port}/prices?symbols=SBIN,TCS")
+
+    poller = None
+    if intraday_seconds:
+        from intraday_bars import IntradayPoller
+        poller = IntradayPoller(updater, poll_seconds=intraday_seconds)
+        poller_thread = poller.start(should_poll=lambda: is_trading_day() and is_trading_hours())
+        print(f"📉 Intraday bars: polling held stocks every {intraday_seconds}s")
+
     # Schedule updates for every hour from 9 AM to 4 PM
-    schedule.every().hour.at(":00").do(update_job)
+    schedule.every().hour.at(":00").do(update_job, updater)
 
     # Run immediately on start if within trading hours
     if is_trading_day() and is_trading_hours():
         print("🔄 Running initial update...")
-        update_job()
+        update_job(updater)
     else:
         now = datetime.now(ist)
         print(f"⏸️  Outside trading hours. Waiting for next scheduled run...")
@@ -278,6 +716,10 @@ def run_scheduler():
             schedule.run_pending()
             time.sleep(60)  # Check every minute
     except KeyboardInterrupt:
+        if poller:
+            # Let the poller write its remaining bars before exiting
+            poller.stop()
+            poller_thread.join(timeout=30)
         print("\n\n" + "="*60)
         print("🛑 Scheduler stopped by user")
         print(f"🕐 Stopped at: {datetime.now(ist).strftime('%Y-%m-%d %H:%M:%S IST')}")
@@ -300,6 +742,7 @@ def main():
         updater = SupabaseUpdater()
         print("=== Updating ALL Stocks from Database ===")
         updater.update_all_stocks()
+        updater.update_index_data()
         print("\n✓ Update completed!")
         print("\n💡 To enable automatic updates every hour (9 AM - 4 PM IST):")
         print("   python update_market_data.py --schedule")
@@ -0,0 +1,69 @@
+-- Migration: Add Index Data Tables
+-- Created: 2026-10-18
+-- Description: Stores the latest snapshot of every NSE index (index_data) and an
+--              append-only history (index_data_history) so benchmark comparisons
+--              read from the database instead of calling NSE per dashboard view
+
+-- Latest value per index (one row per index, upserted every update run)
+CREATE TABLE IF NOT EXISTS public.index_data (
+  id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+  index_name TEXT NOT NULL UNIQUE,
+  index_symbol TEXT,
+  current_value DECIMAL(18, 2),
+  previous_close DECIMAL(18, 2),
+  open DECIMAL(18, 2),
+  high DECIMAL(18, 2),
+  low DECIMAL(18, 2),
+  change DECIMAL(18, 2),
+  change_percent DECIMAL(10, 2),
+  year_high DECIMAL(18, 2),
+  year_low DECIMAL(18, 2),
+  pe_ratio DECIMAL(10, 2),
+  pb_ratio DECIMAL(10, 2),
+  dividend_yield DECIMAL(10, 2),
+  advances INTEGER,
+  declines INTEGER,
+  unchanged INTEGER,
+  as_of TIMESTAMP WITH TIME ZONE NOT NULL,
+  last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Append-only history: one row per index per NSE snapshot time
+CREATE TABLE IF NOT EXISTS public.index_data_history (
+  id BIGSERIAL PRIMARY KEY,
+  index_name TEXT NOT NULL,
+  current_value DECIMAL(18, 2) NOT NULL,
+  previous_close DECIMAL(18, 2),
+  open DECIMAL(18, 2),
+  high DECIMAL(18, 2),
+  low DECIMAL(18, 2),
+  change_percent DECIMAL(10, 2),
+  as_of TIMESTAMP WITH TIME ZONE NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT index_data_history_index_name_as_of_key UNIQUE (index_name, as_of)
+);
+
+-- The unique constraint's index also serves (index_name, as_of) range scans
+CREATE INDEX IF NOT EXISTS idx_index_data_history_as_of ON public.index_data_history(as_of);
+
+ALTER TABLE public.index_data ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.index_data_history ENABLE ROW LEVEL SECURITY;
+
+-- Market data is public to signed-in users; the updater writes with the service role key
+DO $$ BEGIN
+  CREATE POLICY "All authenticated users can view index data" ON public.index_data
+    FOR SELECT USING (auth.role() = 'authenticated');
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "All authenticated users can view index data history" ON public.index_data_history
+    FOR SELECT USING (auth.role() = 'authenticated');
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+COMMENT ON TABLE public.index_data IS 'Latest snapshot of every NSE index from the allIndices API';
+COMMENT ON TABLE public.index_data_history IS 'Append-only NSE index values, one row per index per snapshot time';
+COMMENT ON COLUMN public.index_data.as_of IS 'NSE snapshot time reported by the allIndices API';
@@ -0,0 +1,34 @@
+-- Migration: Add Intraday Bars Table
+-- Created: 2026-10-18
+-- Description: 1-minute and 5-minute OHLCV bars for symbols held in portfolios,
+--              written in batches by the updater's intraday poller
+
+CREATE TABLE IF NOT EXISTS public.intraday_bars (
+  id BIGSERIAL PRIMARY KEY,
+  symbol TEXT NOT NULL,
+  interval_seconds INTEGER NOT NULL,
+  bar_start TIMESTAMP WITH TIME ZONE NOT NULL,
+  open DECIMAL(18, 2) NOT NULL,
+  high DECIMAL(18, 2) NOT NULL,
+  low DECIMAL(18, 2) NOT NULL,
+  close DECIMAL(18, 2) NOT NULL,
+  volume BIGINT DEFAULT 0,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT intraday_bars_symbol_interval_start_key UNIQUE (symbol, interval_seconds, bar_start),
+  CONSTRAINT intraday_bars_interval_check CHECK (interval_seconds IN (60, 300))
+);
+
+-- The unique constraint's index serves per-symbol chart reads; this one serves pruning
+CREATE INDEX IF NOT EXISTS idx_intraday_bars_bar_start ON public.intraday_bars(bar_start);
+
+ALTER TABLE public.intraday_bars ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "All authenticated users can view intraday bars" ON public.intraday_bars
+    FOR SELECT USING (auth.role() = 'authenticated');
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+COMMENT ON TABLE public.intraday_bars IS 'Intraday OHLCV bars (1m/5m) for held symbols, built from polled NSE quotes';
+COMMENT ON COLUMN public.intraday_bars.volume IS 'Traded volume within the bar (difference of cumulative day volume)';
@@ -0,0 +1,32 @@
+-- Migration: Add Mutual Fund NAV History
+-- Created: 2026-10-18
+-- Description: Stores one row per scheme per NAV date, appended incrementally by the
+--              updater, so fund returns and charts no longer parse raw_data JSONB
+
+CREATE TABLE IF NOT EXISTS public.mutual_fund_nav_history (
+  scheme_code TEXT NOT NULL,
+  nav_date DATE NOT NULL,
+  nav DECIMAL(18, 4) NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT mutual_fund_nav_history_pkey PRIMARY KEY (scheme_code, nav_date)
+);
+
+ALTER TABLE public.mutual_fund_nav_history ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "All authenticated users can view mutual fund nav history" ON public.mutual_fund_nav_history
+    FOR SELECT USING (auth.role() = 'authenticated');
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Latest stored NAV date per scheme; the updater only appends dates after it
+CREATE OR REPLACE FUNCTION public.get_nav_high_water_marks(codes TEXT[])
+RETURNS TABLE(scheme_code TEXT, last_nav_date DATE) AS $$
+  SELECT h.scheme_code, MAX(h.nav_date)
+  FROM public.mutual_fund_nav_history h
+  WHERE h.scheme_code = ANY(codes)
+  GROUP BY h.scheme_code;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON TABLE public.mutual_fund_nav_history IS 'Daily NAV per mutual fund scheme from mfapi.in, appended incrementally';
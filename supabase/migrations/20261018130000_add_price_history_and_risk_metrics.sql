@@ -0,0 +1,57 @@
+-- Migration: Add Stock Price History and Portfolio Risk Metrics
+-- Created: 2026-10-18
+-- Description: Daily closing price per stock (upserted by every update run, so the
+--              last run of the day leaves the close) and cached risk metrics per
+--              portfolio / family and window, computed by the updater's risk engine
+
+CREATE TABLE IF NOT EXISTS public.stock_price_history (
+  symbol TEXT NOT NULL,
+  price_date DATE NOT NULL,
+  close DECIMAL(18, 2) NOT NULL,
+  volume BIGINT,
+  last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT stock_price_history_pkey PRIMARY KEY (symbol, price_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_price_history_price_date ON public.stock_price_history(price_date);
+
+-- One row per scope (a portfolio, or a user's whole family) and window length
+CREATE TABLE IF NOT EXISTS public.portfolio_risk_metrics (
+  id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+  user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+  portfolio_id UUID REFERENCES public.portfolios(id) ON DELETE CASCADE,
+  scope TEXT NOT NULL, -- 'portfolio' or 'family'
+  scope_id TEXT NOT NULL, -- portfolio id for 'portfolio', user id for 'family'
+  window_days INTEGER NOT NULL,
+  as_of DATE NOT NULL,
+  volatility DECIMAL(10, 4),
+  beta DECIMAL(10, 4),
+  max_drawdown DECIMAL(10, 4),
+  holdings JSONB, -- {symbol: {volatility, beta, max_drawdown}}
+  correlation JSONB, -- {assets: [...], matrix: [[...]]}
+  last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT portfolio_risk_metrics_scope_key UNIQUE (scope, scope_id, window_days),
+  CONSTRAINT portfolio_risk_metrics_scope_check CHECK (scope IN ('portfolio', 'family'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_portfolio_risk_metrics_user_id ON public.portfolio_risk_metrics(user_id);
+
+ALTER TABLE public.stock_price_history ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.portfolio_risk_metrics ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "All authenticated users can view stock price history" ON public.stock_price_history
+    FOR SELECT USING (auth.role() = 'authenticated');
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can view own risk metrics" ON public.portfolio_risk_metrics
+    FOR SELECT USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+COMMENT ON TABLE public.stock_price_history IS 'Daily closing price per NSE stock, written by the market data updater';
+COMMENT ON TABLE public.portfolio_risk_metrics IS 'Volatility, beta vs NIFTY 50, max drawdown and correlations per portfolio/family and window';
@@ -0,0 +1,44 @@
+-- Migration: Add Portfolio Returns Daily
+-- Created: 2026-10-18
+-- Description: Precomputed daily time-weighted return per portfolio / family, split at
+--              transaction cashflows, alongside the NIFTY 50 return over the same days
+
+-- One row per scope (a portfolio, or a user's whole family) per day
+CREATE TABLE IF NOT EXISTS public.portfolio_returns_daily (
+  user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+  portfolio_id UUID REFERENCES public.portfolios(id) ON DELETE CASCADE,
+  scope TEXT NOT NULL, -- 'portfolio' or 'family'
+  scope_id TEXT NOT NULL, -- portfolio id for 'portfolio', user id for 'family'
+  return_date DATE NOT NULL,
+  portfolio_value DECIMAL(18, 2) NOT NULL,
+  net_flow DECIMAL(18, 2) NOT NULL DEFAULT 0, -- buys minus sells and dividends paid out
+  daily_return DECIMAL(14, 6) NOT NULL,
+  twr DECIMAL(14, 6) NOT NULL, -- cumulative since the first investment
+  benchmark_return DECIMAL(14, 6), -- benchmark return since the same first day
+  excess_return DECIMAL(14, 6) GENERATED ALWAYS AS (twr - benchmark_return) STORED,
+  last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT portfolio_returns_daily_pkey PRIMARY KEY (scope, scope_id, return_date),
+  CONSTRAINT portfolio_returns_daily_scope_check CHECK (scope IN ('portfolio', 'family'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_portfolio_returns_daily_user_id ON public.portfolio_returns_daily(user_id);
+
+ALTER TABLE public.portfolio_returns_daily ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can view own portfolio returns" ON public.portfolio_returns_daily
+    FOR SELECT USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Latest stored day and return per scope; the updater only appends days after it
+-- unless the recomputed return for that day no longer matches
+CREATE OR REPLACE FUNCTION public.get_return_high_water_marks()
+RETURNS TABLE(scope TEXT, scope_id TEXT, last_date DATE, twr DECIMAL) AS $$
+  SELECT DISTINCT ON (r.scope, r.scope_id) r.scope, r.scope_id, r.return_date, r.twr
+  FROM public.portfolio_returns_daily r
+  ORDER BY r.scope, r.scope_id, r.return_date DESC;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON TABLE public.portfolio_returns_daily IS 'Daily time-weighted return per portfolio/family with the NIFTY 50 return over the same period';
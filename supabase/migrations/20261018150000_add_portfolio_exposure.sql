@@ -0,0 +1,33 @@
+-- Migration: Add Portfolio Exposure
+-- Created: 2026-10-18
+-- Description: Stock holdings value by sector, industry and market cap category for
+--              every user, family member and portfolio, rebuilt by the updater each cycle
+
+-- One row per scope and dimension; buckets are ordered by value, largest first
+CREATE TABLE IF NOT EXISTS public.portfolio_exposure (
+  user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+  family_member_id UUID REFERENCES public.family_members(id) ON DELETE CASCADE,
+  portfolio_id UUID REFERENCES public.portfolios(id) ON DELETE CASCADE,
+  scope TEXT NOT NULL, -- 'user', 'member' or 'portfolio'
+  scope_id TEXT NOT NULL, -- user id, family member id (user id for the account holder) or portfolio id
+  dimension TEXT NOT NULL, -- 'sector', 'industry' or 'market_cap'
+  total_value DECIMAL(18, 2) NOT NULL,
+  buckets JSONB NOT NULL, -- [{name, value, weight}]
+  last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT portfolio_exposure_pkey PRIMARY KEY (scope, scope_id, dimension),
+  CONSTRAINT portfolio_exposure_scope_check CHECK (scope IN ('user', 'member', 'portfolio')),
+  CONSTRAINT portfolio_exposure_dimension_check CHECK (dimension IN ('sector', 'industry', 'market_cap'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_portfolio_exposure_user_id ON public.portfolio_exposure(user_id);
+
+ALTER TABLE public.portfolio_exposure ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can view own portfolio exposure" ON public.portfolio_exposure
+    FOR SELECT USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+COMMENT ON TABLE public.portfolio_exposure IS 'Sector, industry and market cap allocation of stock holdings per user, family member and portfolio';
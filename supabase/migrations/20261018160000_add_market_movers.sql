@@ -0,0 +1,25 @@
+-- Migration: Add Market Movers
+-- Created: 2026-10-18
+-- Description: Top gainers and losers of the latest full update cycle, market-wide
+--              and per sector, replaced in one bulk write by the updater
+
+-- One row per sector and direction; movers are ordered best first
+CREATE TABLE IF NOT EXISTS public.market_movers (
+  sector TEXT NOT NULL, -- stock_metadata sector, or 'ALL' for the whole market
+  direction TEXT NOT NULL, -- 'gainers' or 'losers'
+  movers JSONB NOT NULL, -- [{symbol, company_name, price, change_percent}]
+  as_of TIMESTAMP WITH TIME ZONE NOT NULL,
+  CONSTRAINT market_movers_pkey PRIMARY KEY (sector, direction),
+  CONSTRAINT market_movers_direction_check CHECK (direction IN ('gainers', 'losers'))
+);
+
+ALTER TABLE public.market_movers ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "All authenticated users can view market movers" ON public.market_movers
+    FOR SELECT USING (auth.role() = 'authenticated');
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+COMMENT ON TABLE public.market_movers IS 'Top gainers and losers per sector and market-wide from the latest update cycle';
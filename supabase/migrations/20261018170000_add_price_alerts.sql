@@ -0,0 +1,105 @@
+-- Migration: Add Price Alerts
+-- Created: 2026-10-18
+-- Description: Per-user price and day-change alerts, evaluated by the market data
+--              updater as quotes arrive, and the notifications they raise
+
+CREATE TABLE IF NOT EXISTS public.price_alerts (
+  id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+  user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+  symbol TEXT, -- NSE symbol; NULL applies a percent alert to every stock the user holds
+  alert_type TEXT NOT NULL, -- 'price' (threshold in ₹) or 'percent' (day change vs previous close)
+  threshold DECIMAL(18, 4) NOT NULL,
+  direction TEXT NOT NULL DEFAULT 'both', -- 'above', 'below' or 'both'
+  cooldown_minutes INTEGER NOT NULL DEFAULT 60, -- minimum gap between notifications
+  trigger_once BOOLEAN NOT NULL DEFAULT FALSE, -- deactivate after the first notification
+  is_active BOOLEAN NOT NULL DEFAULT TRUE,
+  last_triggered_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  CONSTRAINT price_alerts_type_check CHECK (alert_type IN ('price', 'percent')),
+  CONSTRAINT price_alerts_direction_check CHECK (direction IN ('above', 'below', 'both')),
+  CONSTRAINT price_alerts_threshold_check CHECK (threshold > 0),
+  CONSTRAINT price_alerts_symbol_check CHECK (symbol IS NOT NULL OR alert_type = 'percent')
+);
+
+CREATE TABLE IF NOT EXISTS public.alert_notifications (
+  id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+  alert_id UUID REFERENCES public.price_alerts(id) ON DELETE CASCADE NOT NULL,
+  user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+  symbol TEXT NOT NULL,
+  price DECIMAL(18, 2) NOT NULL,
+  previous_price DECIMAL(18, 2),
+  change_percent DECIMAL(10, 2),
+  message TEXT NOT NULL,
+  triggered_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  read_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_alerts_user_id ON public.price_alerts(user_id);
+CREATE INDEX IF NOT EXISTS idx_price_alerts_active ON public.price_alerts(id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_alert_notifications_user_id ON public.alert_notifications(user_id, triggered_at DESC);
+
+ALTER TABLE public.price_alerts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.alert_notifications ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can view own price alerts" ON public.price_alerts
+    FOR SELECT USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can insert own price alerts" ON public.price_alerts
+    FOR INSERT WITH CHECK (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can update own price alerts" ON public.price_alerts
+    FOR UPDATE USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can delete own price alerts" ON public.price_alerts
+    FOR DELETE USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can view own alert notifications" ON public.alert_notifications
+    FOR SELECT USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE POLICY "Users can update own alert notifications" ON public.alert_notifications
+    FOR UPDATE USING (auth.uid() = user_id);
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  CREATE TRIGGER update_price_alerts_updated_at BEFORE UPDATE ON public.price_alerts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+EXCEPTION
+  WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Record a batch of fired alerts in one statement; one-shot alerts are switched off
+CREATE OR REPLACE FUNCTION public.mark_alerts_triggered(ids UUID[], fired_at TIMESTAMP WITH TIME ZONE)
+RETURNS VOID AS $$
+  UPDATE public.price_alerts
+  SET last_triggered_at = fired_at,
+      is_active = is_active AND NOT trigger_once
+  WHERE id = ANY(ids);
+$$ LANGUAGE sql;
+
+COMMENT ON TABLE public.price_alerts IS 'Per-user price threshold and day-change alerts evaluated by the market data updater';
+COMMENT ON TABLE public.alert_notifications IS 'Notifications raised when a price alert is crossed';
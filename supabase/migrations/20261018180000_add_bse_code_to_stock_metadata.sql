@@ -0,0 +1,7 @@
+-- Add BSE scrip code to stock_metadata
+-- Lets the updater hedge slow NSE quote requests with the same stock's BSE quote
+
+ALTER TABLE public.stock_metadata
+ADD COLUMN IF NOT EXISTS bse_code VARCHAR(10) NULL;
+
+COMMENT ON COLUMN public.stock_metadata.bse_code IS 'BSE scrip code (e.g., 500112), from the export''s BSE Code column when present. Used as the hedged quote fallback.';
@@ -0,0 +1,15 @@
+-- Migration: Add Benchmark Return to Return High-Water Marks
+-- Created: 2026-10-18
+-- Description: Returns the latest stored benchmark_return per scope as well, so the
+--              updater rewrites series whose benchmark was stored as NULL (or has
+--              changed) before the NIFTY 50 history covered their first day
+
+-- The return type changes, so the function has to be dropped first
+DROP FUNCTION IF EXISTS public.get_return_high_water_marks();
+
+CREATE FUNCTION public.get_return_high_water_marks()
+RETURNS TABLE(scope TEXT, scope_id TEXT, last_date DATE, twr DECIMAL, benchmark_return DECIMAL) AS $$
+  SELECT DISTINCT ON (r.scope, r.scope_id) r.scope, r.scope_id, r.return_date, r.twr, r.benchmark_return
+  FROM public.portfolio_returns_daily r
+  ORDER BY r.scope, r.scope_id, r.return_date DESC;
+$$ LANGUAGE sql STABLE;